@@ -13,6 +13,54 @@ import struct
 
 logger = logging.getLogger(__name__)
 
+# Canonical 44-byte PCM WAV header: RIFF size, format fields, data size
+_WAV_HEADER_FORMAT = '<4sI4s4sIHHIIHH4sI'
+
+# Header for Teler's mono 16-bit 8kHz PCM; only the two size fields vary per call
+WAV_HEADER_TEMPLATE = struct.pack(
+    _WAV_HEADER_FORMAT, b'RIFF', 36, b'WAVE', b'fmt ', 16, 1, 1, 8000, 16000, 2, 16, b'data', 0
+)
+
+def build_wav_header(data_size: int, sample_rate: int = 8000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    Build a PCM WAV header without going through the wave module
+    
+    Args:
+        data_size: Size of the PCM payload in bytes
+        sample_rate: Sample rate in Hz (default: 8000)
+        channels: Number of channels (default: 1 for mono)
+        sample_width: Sample width in bytes (default: 2 for 16-bit)
+        
+    Returns:
+        44-byte WAV header
+    """
+    if sample_rate == 8000 and channels == 1 and sample_width == 2:
+        header = bytearray(WAV_HEADER_TEMPLATE)
+        struct.pack_into('<I', header, 4, 36 + data_size)
+        struct.pack_into('<I', header, 40, data_size)
+        return bytes(header)
+
+    block_align = channels * sample_width
+    return struct.pack(
+        _WAV_HEADER_FORMAT, b'RIFF', 36 + data_size, b'WAVE', b'fmt ', 16, 1, channels,
+        sample_rate, sample_rate * block_align, block_align, sample_width * 8, b'data', data_size
+    )
+
+def pcm_to_wav(pcm_data: bytes, sample_rate: int = 8000, channels: int = 1, sample_width: int = 2) -> bytes:
+    """
+    Wrap raw PCM audio in a WAV container
+    
+    Args:
+        pcm_data: Raw PCM audio (any bytes-like object)
+        sample_rate: Sample rate in Hz (default: 8000)
+        channels: Number of channels (default: 1 for mono)
+        sample_width: Sample width in bytes (default: 2 for 16-bit)
+        
+    Returns:
+        WAV formatted audio data
+    """
+    return b''.join((build_wav_header(len(pcm_data), sample_rate, channels, sample_width), pcm_data))
+
 def convert_teler_to_sarvam_audio(audio_b64: str) -> str:
     """
     Convert Teler audio format to Sarvam TTS format
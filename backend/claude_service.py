@@ -5,7 +5,9 @@ Provides AI-powered call flow generation and conversation handling.
 """
 
 import os
+import json
 import logging
+import re
 from typing import Dict, Any, Optional
 try:
     from anthropic import Anthropic
@@ -234,9 +236,6 @@ class ClaudeService:
         """Parse Claude's response to extract call flow configuration."""
         try:
             # Try to extract JSON from the response
-            import json
-            import re
-            
             # Look for JSON in the response
             json_match = re.search(r'\{.*\}', response_text, re.DOTALL)
             if json_match:
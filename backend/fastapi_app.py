@@ -8,6 +8,9 @@ import os
 import json
 import logging
 import asyncio
+import re
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from datetime import datetime
 from fastapi import FastAPI, WebSocket, WebSocketDisconnect, HTTPException, Body, status
@@ -34,12 +37,33 @@ try:
 except ImportError:
     TELER_AVAILABLE = False
 
+# uvloop ships with uvicorn[standard]; it is not available on Windows
+try:
+    import uvloop  # noqa: F401
+    UVLOOP_AVAILABLE = True
+except ImportError:
+    UVLOOP_AVAILABLE = False
+
 load_dotenv()
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Emoji and pictographs used as log markers (misc technical, symbols/dingbats, variation
+# selector, SMP emoji), with the space that follows them
+_EMOJI_RE = re.compile('[\u2300-\u23ff\u2600-\u27bf\u2b00-\u2bff\ufe0f\U0001f000-\U0001faff]+ ?')
+
+class _StripEmojiFormatter(logging.Formatter):
+    """Drop emoji from formatted log lines so production logs stay plain ASCII where possible"""
+    def format(self, record: logging.LogRecord) -> str:
+        # Only this handler's output changes; the record other handlers see is untouched
+        return _EMOJI_RE.sub('', super().format(record))
+
+if os.getenv('LOG_STRIP_EMOJI', 'false').lower() == 'true':
+    for _handler in logging.getLogger().handlers:
+        _handler.setFormatter(_StripEmojiFormatter(logging.BASIC_FORMAT))
+
 # Initialize FastAPI app
 app = FastAPI(title="AdrshyamAI Call Service", version="1.0.0")
 
@@ -61,9 +85,73 @@ TELER_API_KEY = os.getenv('TELER_API_KEY', 'cf771fc46a1fddb7939efa742801de98e48b
 BACKEND_DOMAIN = os.getenv('BACKEND_DOMAIN', 'localhost:8000')
 BACKEND_URL = f"https://{BACKEND_DOMAIN}" if not BACKEND_DOMAIN.startswith('localhost') else f"http://{BACKEND_DOMAIN}"
 
+# Worker threads for CPU-bound audio processing off the event loop
+AUDIO_WORKER_THREADS = int(os.getenv('AUDIO_WORKER_THREADS', 4))
+
 # In-memory storage for call history
 call_history = []
 
+# Indexes over call_history used by the WebSocket handler's knowledge base lookup
+call_history_by_id: Dict[str, Dict[str, Any]] = {}
+# (parsed timestamp, record) for the most recent conversation calls with a KB, ordered newest first.
+# The parsed datetime lives here rather than on the record so the history API stays JSON-clean.
+recent_kb_calls = deque(maxlen=50)
+
+def _track_recent_kb_call(call_record: Dict[str, Any]):
+    """Add a conversation call with a knowledge base to recent_kb_calls"""
+    # A record that is already tracked keeps its place (its KB id is read live),
+    # matching the first-match-in-history order of call_history itself
+    for _, tracked in recent_kb_calls:
+        if tracked is call_record:
+            return
+    try:
+        call_time = datetime.fromisoformat(call_record['timestamp'])
+    except (KeyError, TypeError, ValueError) as e:
+        logger.warning(f"⚠️ Not tracking call '{call_record.get('call_id')}' for KB lookup, bad timestamp: {e}")
+        return
+    # Keep the deque newest first so the lookup can stop at the first stale entry;
+    # a call that only now got a KB may be older than ones already tracked
+    index = 0
+    for tracked_time, _ in recent_kb_calls:
+        if tracked_time <= call_time:
+            break
+        index += 1
+    if len(recent_kb_calls) == recent_kb_calls.maxlen:
+        if index == len(recent_kb_calls):
+            return  # Older than everything kept
+        recent_kb_calls.pop()
+    recent_kb_calls.insert(index, (call_time, call_record))
+
+def add_call_record(call_record: Dict[str, Any]):
+    """Store a call record in history and keep the lookup indexes in sync"""
+    call_history.insert(0, call_record)
+    call_history_by_id[call_record['call_id']] = call_record
+    if call_record.get('call_type') == 'conversation' and call_record.get('knowledge_base_id'):
+        _track_recent_kb_call(call_record)
+
+websocket_handler.attach_call_history(call_history, call_history_by_id, recent_kb_calls)
+
+@app.on_event("startup")
+async def warm_caches():
+    """Pre-generate static audio in the background so startup is not held up by TTS"""
+    loop = asyncio.get_running_loop()
+    logger.info(f"Event loop: {type(loop).__module__}.{type(loop).__name__}")
+
+    # Bounded pool for the handler's asyncio.to_thread audio work (VAD, levels)
+    loop.set_default_executor(
+        ThreadPoolExecutor(max_workers=AUDIO_WORKER_THREADS, thread_name_prefix='audio')
+    )
+
+    if sarvam_service.is_available():
+        websocket_handler.start_tts_warmup()
+
+@app.on_event("shutdown")
+async def close_http_sessions():
+    """Stop the handler's background tasks and deliver queued call transcripts, then release pooled HTTP connections held by shared service clients"""
+    await websocket_handler.stop_background_tasks()
+    await websocket_handler.flush_transcripts()
+    await sarvam_service.close()
+
 # Pydantic models
 class CallFlowRequest(BaseModel):
     call_id: str
@@ -202,37 +290,33 @@ async def webhook_receiver(data: dict = Body(...)):
         call_id = data.get('data', {}).get('call_id')
         if call_id:
             # Find and mark WebSocket connections as ended
-            for connection_id, metadata in websocket_handler.stream_metadata.items():
-                if metadata.get('call_id') == call_id:
+            for connection_id, conn in websocket_handler.connections.items():
+                metadata = conn.stream_metadata
+                if metadata and metadata.get('call_id') == call_id:
                     logger.info(f"Marking call as ended for connection: {connection_id}")
-                    if connection_id in websocket_handler.call_states:
-                        websocket_handler.call_states[connection_id]['call_ended'] = True
-                        websocket_handler.call_states[connection_id]['status'] = 'completed'
-                        websocket_handler.call_states[connection_id]['is_processing'] = False
+                    conn.call_ended = True
+                    conn.status = 'completed'
+                    conn.is_processing = False
                     
                     # Cancel any ongoing silence monitoring
-                    if connection_id in websocket_handler.silence_timers:
-                        websocket_handler.silence_timers[connection_id].cancel()
-                        del websocket_handler.silence_timers[connection_id]
+                    conn.cancel_silence_check()
                     
                     # Clear audio buffer to prevent further processing
-                    if connection_id in websocket_handler.audio_buffers:
-                        websocket_handler.audio_buffers[connection_id].clear()
-                        logger.info(f"🧹 Cleared audio buffer for ended call: {connection_id}")
+                    conn.clear_audio()
+                    logger.info(f"🧹 Cleared audio buffer for ended call: {connection_id}")
     
     # Update call history with webhook data
     call_id = data.get('call_id') or data.get('CallSid') or data.get('id') or data.get('data', {}).get('call_id')
     if call_id:
-        for call in call_history:
-            if call.get('call_id') == call_id:
-                call['webhook_data'] = data
-                call['status'] = data.get('status') or data.get('data', {}).get('status', call['status'])
-                call['updated_at'] = datetime.now().isoformat()
-                if event == 'call.completed':
-                    call['status'] = 'completed'
-                    call['end_time'] = data.get('data', {}).get('hangup_time')
-                    call['duration'] = data.get('data', {}).get('duration')
-                break
+        call = call_history_by_id.get(call_id)
+        if call is not None:
+            call['webhook_data'] = data
+            call['status'] = data.get('status') or data.get('data', {}).get('status', call['status'])
+            call['updated_at'] = datetime.now().isoformat()
+            if event == 'call.completed':
+                call['status'] = 'completed'
+                call['end_time'] = data.get('data', {}).get('hangup_time')
+                call['duration'] = data.get('data', {}).get('duration')
     
     return JSONResponse(content={"message": "Webhook received successfully"})
 
@@ -271,7 +355,7 @@ async def initiate_call(request: CallInitiateRequest):
         }
         
         # Store in history
-        call_history.insert(0, call_record)
+        add_call_record(call_record)
 
         logger.info(f"✅ Call initiated successfully: {call_response['call_id']}")
         if request.knowledge_base_id:
@@ -338,7 +422,7 @@ async def get_active_calls():
 @app.get("/api/calls/{call_id}")
 async def get_call_details(call_id: str):
     """Get details for a specific call."""
-    call = next((c for c in call_history if c['call_id'] == call_id), None)
+    call = call_history_by_id.get(call_id)
     
     if not call:
         raise HTTPException(status_code=404, detail="Call not found")
@@ -511,10 +595,16 @@ async def handle_media_stream(websocket: WebSocket):
         # Handle incoming messages
         while True:
             try:
-                # Receive message from Teler
-                message = await websocket.receive_text()
+                # Receive message from Teler; binary frames are handed to the
+                # JSON parser as-is (orjson takes bytes without a decode)
+                frame = await websocket.receive()
+                if frame["type"] == "websocket.disconnect":
+                    raise WebSocketDisconnect(frame.get("code", 1000))
+                message = frame.get("text")
+                if message is None:
+                    message = frame.get("bytes")
                 #logger.info(f"Received message: {message}")
-                logger.debug(f"Received message: {message[:100]}...")
+                logger.debug("Received message: %.100s...", message)  # Lazy: no slice per packet
                 
                 # Handle the message
                 await websocket_handler.handle_incoming_message(websocket, message, connection_id)
@@ -524,14 +614,8 @@ async def handle_media_stream(websocket: WebSocket):
                 break
             except Exception as e:
                 logger.error(f"Error handling WebSocket message: {e}")
-                # Send error message back to client
-                error_response = {
-                    "type": "error",
-                    "message": str(e)
-                }
-                try:
-                    await websocket.send_text(json.dumps(error_response))
-                except:
+                # Send error message back to client (queued behind any audio in flight)
+                if not websocket_handler.send_error(connection_id, str(e)):
                     break
                 
     except WebSocketDisconnect:
@@ -580,16 +664,14 @@ async def associate_knowledge_base(data: dict = Body(...)):
             raise HTTPException(status_code=400, detail="call_id is required")
 
         # Check if call already exists in history (from initiate_call)
-        existing_call = None
-        for call in call_history:
-            if call.get('call_id') == call_id:
-                existing_call = call
-                break
+        existing_call = call_history_by_id.get(call_id)
 
         if existing_call:
             # Update existing call record with knowledge base
             existing_call['knowledge_base_id'] = knowledge_base_id
             existing_call['updated_at'] = datetime.now().isoformat()
+            if existing_call.get('call_type') == 'conversation' and knowledge_base_id:
+                _track_recent_kb_call(existing_call)
             logger.info(f"📚 Updated existing call '{call_id}' with knowledge base '{knowledge_base_id}'")
         else:
             # Store new call record for WebSocket connections
@@ -606,7 +688,7 @@ async def associate_knowledge_base(data: dict = Body(...)):
                 'notes': 'AdrshyamAI Audio Client connection'
             }
 
-            call_history.insert(0, call_record)
+            add_call_record(call_record)
             logger.info(f"📚 Associated knowledge base '{knowledge_base_id}' with new call '{call_id}'")
 
         return {
@@ -737,6 +819,7 @@ if __name__ == "__main__":
     
     logger.info(f"Starting Teler FastAPI Service on port {port}")
     logger.info(f"Teler library available: {TELER_AVAILABLE}")
+    logger.info(f"uvloop event loop: {UVLOOP_AVAILABLE}")
     logger.info(f"Environment variables loaded:")
     logger.info(f"  - OLLAMA_API_URL: {os.getenv('OLLAMA_API_URL', 'https://ebf431ea9bc8.ngrok-free.app')}")
     logger.info(f"  - OLLAMA_MODEL: {os.getenv('OLLAMA_MODEL', 'llama3.2')}")
@@ -756,5 +839,6 @@ if __name__ == "__main__":
         "fastapi_app:app",
         host="0.0.0.0",
         port=port,
+        loop="uvloop" if UVLOOP_AVAILABLE else "auto",
         reload=os.getenv('ENVIRONMENT') == 'development'
     )
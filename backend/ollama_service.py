@@ -6,10 +6,14 @@ Provides AI-powered call flow generation and conversation handling using Ollama.
 
 import os
 import json
+import asyncio
+import functools
 import logging
+import threading
 import requests
 import psycopg2
 from psycopg2.extras import RealDictCursor
+from concurrent.futures import ThreadPoolExecutor
 from typing import Dict, Any, Optional
 from dotenv import load_dotenv
 
@@ -17,6 +21,11 @@ load_dotenv()
 
 logger = logging.getLogger(__name__)
 
+# The prompt lookup (psycopg2) and completion (requests) calls block, so they run on
+# their own threads: off the event loop, and never queued behind audio work
+OLLAMA_WORKER_THREADS = int(os.getenv('OLLAMA_WORKER_THREADS', 8))
+_blocking_executor = ThreadPoolExecutor(max_workers=OLLAMA_WORKER_THREADS, thread_name_prefix='ollama')
+
 class OllamaService:
     """Service for interacting with Ollama LLM API."""
 
@@ -122,8 +131,12 @@ class OllamaService:
             current_input = conversation_context.get('current_input', '')
             user_id = conversation_context.get('user_id')
 
+            loop = asyncio.get_running_loop()
+
             # ✅ Fetch active conversational prompt
-            active_prompt = self._get_active_conversational_prompt(user_id=user_id)
+            active_prompt = await loop.run_in_executor(
+                _blocking_executor, functools.partial(self._get_active_conversational_prompt, user_id=user_id)
+            )
 
             # Optional RAG (Knowledge Base) context
             if knowledge_base_id and current_input and rag_service.is_available():
@@ -136,8 +149,18 @@ class OllamaService:
             # Build conversation prompt (with fallback)
             prompt = self._build_conversation_prompt(conversation_context, knowledge_base_context, active_prompt)
 
-            # Generate completion
-            response = self._generate_completion(prompt, temperature=0.7, max_tokens=500, model_override=model_override)
+            # Generate completion. Cancelling this coroutine does not stop the worker
+            # thread, so the event tells it to drop the request and free its slot
+            cancelled = threading.Event()
+            try:
+                response = await loop.run_in_executor(
+                    _blocking_executor,
+                    functools.partial(self._generate_completion, prompt, temperature=0.7, max_tokens=500,
+                                      model_override=model_override, cancelled=cancelled)
+                )
+            except asyncio.CancelledError:
+                cancelled.set()
+                raise
             return response.strip() if response else "I'm here. Please continue."
 
         except Exception as e:
@@ -147,8 +170,17 @@ class OllamaService:
     # -------------------------------------------------------
     # 🔧 Generate completion (send to Ollama)
     # -------------------------------------------------------
-    def _generate_completion(self, prompt: str, temperature: float = 0.7, max_tokens: int = 500, model_override: Optional[str] = None) -> str:
-        """Generate completion using Ollama."""
+    def _generate_completion(self, prompt: str, temperature: float = 0.7, max_tokens: int = 500, model_override: Optional[str] = None,
+                             cancelled: Optional[threading.Event] = None) -> str:
+        """
+        Generate completion using Ollama.
+
+        The reply is streamed so that setting ``cancelled`` stops it between chunks;
+        closing the connection makes Ollama abandon the generation. Returns "" when cancelled.
+        """
+        if cancelled is not None and cancelled.is_set():
+            return ""
+
         try:
             headers = {
                 'Content-Type': 'application/json',
@@ -157,23 +189,35 @@ class OllamaService:
             payload = {
                 "model": model_override or self.model, # Use override if provided
                 "messages": [{"role": "user", "content": prompt}],
-                "stream": False,
+                "stream": True,
                 "keep_alive": -1
             }
-            response = requests.post(
+            with requests.post(
                 f"{self.api_url}/api/chat",
                 json=payload,
                 headers=headers,
-                timeout=60
-            )
-
-            if response.status_code == 200:
-                result = response.json()
-                message = result.get('message', {})
-                return message.get('content', '')
-            else:
-                logger.error(f"Ollama API error {response.status_code}: {response.text}")
-                return ""
+                timeout=60,
+                stream=True
+            ) as response:
+                if response.status_code != 200:
+                    logger.error(f"Ollama API error {response.status_code}: {response.text}")
+                    return ""
+
+                parts = []
+                for line in response.iter_lines():
+                    if cancelled is not None and cancelled.is_set():
+                        logger.debug("Ollama completion cancelled after %d chunks", len(parts))
+                        return ""
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get('error'):
+                        logger.error(f"Ollama API error: {chunk['error']}")
+                        return ""
+                    parts.append(chunk.get('message', {}).get('content', ''))
+                    if chunk.get('done'):
+                        break
+                return ''.join(parts)
 
         except Exception as e:
             logger.error(f"Error calling Ollama API: {e}")
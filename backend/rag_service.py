@@ -9,6 +9,7 @@ import os
 import logging
 import io
 import json
+import traceback
 from typing import List, Dict, Any, Optional, BinaryIO
 from datetime import datetime
 import tiktoken
@@ -475,7 +476,6 @@ class RAGService:
 
         except Exception as e:
             logger.error(f"❌ Error searching knowledge base: {str(e)}")
-            import traceback
             logger.error(traceback.format_exc())
             return []
         finally:
@@ -5,27 +5,71 @@ Integrates with Sarvam AI API for audio processing in calls
 """
 
 import os
-import base64
 import logging
 import aiohttp
 import asyncio
-import tempfile
-import io
+import re
 import struct
-import wave
-from typing import Optional, Dict, Any
+import time
+from typing import Optional, Dict, Any, AsyncIterator, List
 from dotenv import load_dotenv
+from audio_utils import pcm_to_wav
 
 load_dotenv()
 
+# Prefer the SIMD pybase64 implementation when it is installed
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
 logger = logging.getLogger(__name__)
 
+# Language names (in English and Hindi) a caller may ask to switch to
+LANGUAGE_KEYWORDS = {
+    # English keywords
+    "english": "en-IN",
+    "hindi": "hi-IN",
+    "bengali": "bn-IN",
+    "gujarati": "gu-IN",
+    "kannada": "kn-IN",
+    "malayalam": "ml-IN",
+    "marathi": "mr-IN",
+    "odia": "or-IN",
+    "punjabi": "pa-IN",
+    "tamil": "ta-IN",
+    "telugu": "te-IN",
+    # Hindi keywords
+    "अंग्रेजी": "en-IN",
+    "हिंदी": "hi-IN",
+    "बंगाली": "bn-IN",
+    "गुजराती": "gu-IN",
+    "कन्नड़": "kn-IN",
+    "मलयालम": "ml-IN",
+    "मराठी": "mr-IN",
+    "उड़िया": "or-IN",
+    "पंजाबी": "pa-IN",
+    "तमिल": "ta-IN",
+    "तेलुगु": "te-IN"
+}
+
+# Phrases that mark a request to change the conversation language
+_SWITCH_PHRASES = ("switch to", "change to", "speak in", "talk in", "बदलो", "बोलो")
+
+# One scan each instead of a Python loop of substring tests per phrase/keyword
+_SWITCH_PHRASE_RE = re.compile('|'.join(map(re.escape, _SWITCH_PHRASES)))
+# The lookahead reports a keyword at every position, so overlapping keywords are all seen
+_LANGUAGE_KEYWORD_RE = re.compile('(?=(' + '|'.join(map(re.escape, sorted(LANGUAGE_KEYWORDS, key=len, reverse=True))) + '))')
+# When several languages are named, the one listed first in LANGUAGE_KEYWORDS wins
+_LANGUAGE_KEYWORD_RANK = {keyword: rank for rank, keyword in enumerate(LANGUAGE_KEYWORDS)}
+
 class SarvamAIService:
     """Service for interacting with Sarvam AI API for STT and TTS."""
     
     def __init__(self):
         self.api_key = os.getenv('SARVAM_API_KEY')
         self.base_url = "https://api.sarvam.ai"
+        self._session: Optional[aiohttp.ClientSession] = None  # Shared keep-alive pool, created on first request
         
         if not self.api_key:
             logger.warning("SARVAM_API_KEY not found, Sarvam AI features will be disabled")
@@ -35,6 +79,23 @@ class SarvamAIService:
     def is_available(self) -> bool:
         """Check if Sarvam AI service is available."""
         return self.api_key is not None
+
+    def _get_session(self) -> aiohttp.ClientSession:
+        """
+        Return the shared HTTP session, creating it inside the running event loop if needed.
+        Reusing one session keeps TLS connections to the API alive between requests.
+        """
+        if self._session is None or self._session.closed:
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=32, keepalive_timeout=60)
+            )
+        return self._session
+
+    async def close(self):
+        """Close the shared HTTP session (called on application shutdown)."""
+        if self._session is not None and not self._session.closed:
+            await self._session.close()
+        self._session = None
     
     async def speech_to_text(self, audio_base64: str, language: str = "en-IN") -> Optional[Dict[str, Any]]:
         """
@@ -50,13 +111,34 @@ class SarvamAIService:
         if not self.is_available():
             logger.warning("Sarvam AI not available for STT")
             return None
-        
+
         try:
-            logger.info(f"Converting speech to text using Sarvam AI (language: {language})")
-            
             # Decode base64 audio data (raw PCM from Teler)
             audio_data = base64.b64decode(audio_base64)
             logger.info(f"Decoded raw audio data: {len(audio_data)} bytes")
+        except Exception as e:
+            logger.error(f"Error in Sarvam STT: {str(e)}")
+            return None
+
+        return await self.speech_to_text_pcm(audio_data, language=language)
+
+    async def speech_to_text_pcm(self, audio_data: bytes, language: str = "en-IN") -> Optional[Dict[str, Any]]:
+        """
+        Convert raw PCM speech to text using Sarvam AI STT API.
+
+        Args:
+            audio_data: Raw 16-bit PCM audio (mono, 8kHz) as sent by Teler
+            language: Language code (default: en-IN for Hindi)
+
+        Returns:
+            Dictionary with 'transcript' and 'language' keys, or None if failed
+        """
+        if not self.is_available():
+            logger.warning("Sarvam AI not available for STT")
+            return None
+        
+        try:
+            logger.info(f"Converting speech to text using Sarvam AI (language: {language}, {len(audio_data)} bytes)")
             
             # Convert raw PCM to WAV format
             wav_data = self._convert_raw_pcm_to_wav(audio_data)
@@ -64,57 +146,39 @@ class SarvamAIService:
                 logger.error("Failed to convert raw PCM to WAV format")
                 return None
             
-            # Create temporary WAV file
-            with tempfile.NamedTemporaryFile(suffix='.wav', delete=False) as temp_file:
-                temp_file.write(wav_data)
-                temp_file_path = temp_file.name
-            
-            logger.info(f"Temporary WAV file created at: {temp_file_path}")
-            
-            # Prepare multipart form data
+            # Prepare multipart form data; the WAV is uploaded straight from memory
             data = aiohttp.FormData()
             data.add_field('language_code', language)
             data.add_field('model', 'saarika:v2.5')
+            data.add_field('file', wav_data, filename='audio.wav', content_type='audio/wav')
             
-            # Add the MP3 file
-            with open(temp_file_path, 'rb') as f:
-                data.add_field('file', f, filename='audio.wav', content_type='audio/wav')
-                
-                headers = {
-                    "API-Subscription-Key": self.api_key
-                }
+            headers = {
+                "API-Subscription-Key": self.api_key
+            }
+            
+            async with self._get_session().post(
+                f"{self.base_url}/speech-to-text",
+                data=data,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
                 
-                async with aiohttp.ClientSession() as session:
-                    async with session.post(
-                        f"{self.base_url}/speech-to-text",
-                        data=data,
-                        headers=headers,
-                        timeout=aiohttp.ClientTimeout(total=30)
-                    ) as response:
-                        
-                        if response.status == 200:
-                            result = await response.json()
-                            transcript = result.get("transcript", "")
-                            logger.info(f"STT successful: '{transcript}' (language: {language})")
-                            return {
-                                "transcript": transcript,
-                                "language": language
-                            }
-                        else:
-                            error_text = await response.text()
-                            logger.error(f"Sarvam STT API error {response.status}: {error_text}")
-                            return None
+                if response.status == 200:
+                    result = await response.json()
+                    transcript = result.get("transcript", "")
+                    logger.info(f"STT successful: '{transcript}' (language: {language})")
+                    return {
+                        "transcript": transcript,
+                        "language": language
+                    }
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Sarvam STT API error {response.status}: {error_text}")
+                    return None
             
         except Exception as e:
             logger.error(f"Error in Sarvam STT: {str(e)}")
             return None
-        finally:
-            # Clean up temporary file
-            try:
-                if 'temp_file_path' in locals():
-                    os.unlink(temp_file_path)
-            except Exception as e:
-                logger.warning(f"Failed to clean up temp file: {e}")
                         
     def _convert_raw_pcm_to_wav(self, raw_audio_data: bytes, sample_rate: int = 8000, channels: int = 1, sample_width: int = 2) -> Optional[bytes]:
         """
@@ -142,20 +206,11 @@ class SarvamAIService:
             if len(raw_audio_data) % expected_alignment != 0:
                 # Pad with zeros to align
                 padding_needed = expected_alignment - (len(raw_audio_data) % expected_alignment)
-                raw_audio_data += b'\x00' * padding_needed
+                raw_audio_data = bytes(raw_audio_data) + b'\x00' * padding_needed
                 logger.info(f"Padded audio data with {padding_needed} bytes for alignment")
             
-            # Create WAV file in memory
-            wav_buffer = io.BytesIO()
-            
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(channels)
-                wav_file.setsampwidth(sample_width)
-                wav_file.setframerate(sample_rate)
-                wav_file.writeframes(raw_audio_data)
-            
-            # Get WAV data
-            wav_data = wav_buffer.getvalue()
+            # Prepend a prebuilt WAV header (no wave/BytesIO machinery per call)
+            wav_data = pcm_to_wav(raw_audio_data, sample_rate, channels, sample_width)
             logger.info(f"Successfully converted to WAV: {len(wav_data)} bytes")
             
             return wav_data
@@ -174,7 +229,6 @@ class SarvamAIService:
             prefix: Filename prefix
         """
         try:
-            import time
             timestamp = int(time.time())
             
             # Save raw file
@@ -242,27 +296,26 @@ class SarvamAIService:
                 "Content-Type": "application/json"
             }
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/text-to-speech",
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=30)
-                ) as response:
-                    
-                    if response.status == 200:
-                        result = await response.json()
-                        audio_base64 = result.get("audios", [None])[0]
-                        if audio_base64:
-                            logger.info(f"TTS successful for text: '{text}'")
-                            return audio_base64
-                        else:
-                            logger.error("No audio data in Sarvam TTS response")
-                            return None
+            async with self._get_session().post(
+                f"{self.base_url}/text-to-speech",
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=30)
+            ) as response:
+                
+                if response.status == 200:
+                    result = await response.json()
+                    audio_base64 = result.get("audios", [None])[0]
+                    if audio_base64:
+                        logger.info(f"TTS successful for text: '{text}'")
+                        return audio_base64
                     else:
-                        error_text = await response.text()
-                        logger.error(f"Sarvam TTS API error {response.status}: {error_text}")
+                        logger.error("No audio data in Sarvam TTS response")
                         return None
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Sarvam TTS API error {response.status}: {error_text}")
+                    return None
                         
         except asyncio.TimeoutError:
             logger.error("Sarvam TTS API timeout")
@@ -271,6 +324,37 @@ class SarvamAIService:
             logger.error(f"Error in Sarvam TTS: {str(e)}")
             return None
     
+    async def text_to_speech_stream(self, sentences: List[str], language: str = "en-IN",
+                                    speaker: str = "anushka") -> AsyncIterator[str]:
+        """
+        Synthesize sentences concurrently and yield each one's audio in order as soon as it is ready.
+
+        The REST endpoint only returns whole clips, so the stream granularity is one
+        sentence: the caller can start playback after the first sentence's TTS.
+        Sentences that fail to synthesize are skipped.
+
+        Args:
+            sentences: Text to speak, in playback order
+            language: Target language code
+            speaker: Voice to use
+
+        Yields:
+            Base64 encoded audio for each sentence
+        """
+        tasks = [
+            asyncio.create_task(self.text_to_speech(text=sentence, language=language, speaker=speaker))
+            for sentence in sentences
+        ]
+        try:
+            for task in tasks:
+                audio_base64 = await task
+                if audio_base64:
+                    yield audio_base64
+        finally:
+            # Consumer stopped early (or was cancelled): drop the remaining requests
+            for task in tasks:
+                task.cancel()
+
     async def detect_language_from_text(self, text: str) -> Optional[str]:
         """
         Detect language from text using Sarvam AI Language Identification API.
@@ -296,29 +380,28 @@ class SarvamAIService:
                 "Content-Type": "application/json"
             }
 
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f"{self.base_url}/text-lid",
-                    json=payload,
-                    headers=headers,
-                    timeout=aiohttp.ClientTimeout(total=10)
-                ) as response:
-
-                    if response.status == 200:
-                        result = await response.json()
-                        language_code = result.get("language_code")
-                        script_code = result.get("script_code")
-
-                        if language_code:
-                            logger.info(f"Detected language: {language_code} (script: {script_code})")
-                            return language_code
-                        else:
-                            logger.warning("No language code in response")
-                            return "en-IN"
+            async with self._get_session().post(
+                f"{self.base_url}/text-lid",
+                json=payload,
+                headers=headers,
+                timeout=aiohttp.ClientTimeout(total=10)
+            ) as response:
+
+                if response.status == 200:
+                    result = await response.json()
+                    language_code = result.get("language_code")
+                    script_code = result.get("script_code")
+
+                    if language_code:
+                        logger.info(f"Detected language: {language_code} (script: {script_code})")
+                        return language_code
                     else:
-                        error_text = await response.text()
-                        logger.error(f"Language detection API error {response.status}: {error_text}")
+                        logger.warning("No language code in response")
                         return "en-IN"
+                else:
+                    error_text = await response.text()
+                    logger.error(f"Language detection API error {response.status}: {error_text}")
+                    return "en-IN"
 
         except Exception as e:
             logger.error(f"Error in language detection: {str(e)}")
@@ -331,32 +414,7 @@ class SarvamAIService:
         Returns:
             Dictionary mapping language keywords to Sarvam AI language codes
         """
-        return {
-            # English keywords
-            "english": "en-IN",
-            "hindi": "hi-IN",
-            "bengali": "bn-IN",
-            "gujarati": "gu-IN",
-            "kannada": "kn-IN",
-            "malayalam": "ml-IN",
-            "marathi": "mr-IN",
-            "odia": "or-IN",
-            "punjabi": "pa-IN",
-            "tamil": "ta-IN",
-            "telugu": "te-IN",
-            # Hindi keywords
-            "अंग्रेजी": "en-IN",
-            "हिंदी": "hi-IN",
-            "बंगाली": "bn-IN",
-            "गुजराती": "gu-IN",
-            "कन्नड़": "kn-IN",
-            "मलयालम": "ml-IN",
-            "मराठी": "mr-IN",
-            "उड़िया": "or-IN",
-            "पंजाबी": "pa-IN",
-            "तमिल": "ta-IN",
-            "तेलुगु": "te-IN"
-        }
+        return dict(LANGUAGE_KEYWORDS)
 
     def detect_language_switch_request(self, text: str) -> Optional[str]:
         """
@@ -368,25 +426,16 @@ class SarvamAIService:
         Returns:
             Language code if switch detected, None otherwise
         """
-        text_lower = text.lower().strip()
-
-        # Common language switch patterns
-        switch_patterns = [
-            "switch to", "change to", "speak in", "talk in",
-            "बदलो", "बोलो", "में बोलो"
-        ]
-
-        # Check if text contains switch pattern
-        is_switch_request = any(pattern in text_lower for pattern in switch_patterns)
-
-        if is_switch_request:
-            # Look for language name in text
-            language_map = self.get_language_map()
-
-            for keyword, lang_code in language_map.items():
-                if keyword in text_lower:
-                    logger.info(f"Language switch detected: '{keyword}' -> {lang_code}")
-                    return lang_code
+        text_lower = text.lower()
+
+        # Check if text contains switch pattern, then look for the language named
+        if _SWITCH_PHRASE_RE.search(text_lower):
+            keywords = {match.group(1) for match in _LANGUAGE_KEYWORD_RE.finditer(text_lower)}
+            if keywords:
+                keyword = min(keywords, key=_LANGUAGE_KEYWORD_RANK.__getitem__)
+                lang_code = LANGUAGE_KEYWORDS[keyword]
+                logger.info(f"Language switch detected: '{keyword}' -> {lang_code}")
+                return lang_code
 
         return None
 
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+Scenario tests for the Teler WebSocket handler
+Drives handle_incoming_message with a fake websocket and stubbed Sarvam/Ollama
+services, so no network, database or API keys are needed.
+
+Run directly (python test_websocket_handler.py) or with pytest.
+"""
+
+import asyncio
+import base64
+import json
+import logging
+from contextlib import ExitStack
+from unittest import mock
+
+import numpy as np
+
+import websocket_handler as wh
+from vad_processor import vad_processor
+from websocket_handler import TelerWebSocketHandler
+
+logging.basicConfig(level=logging.WARNING)
+
+USER_TRANSCRIPT = "I need some help with my account"
+AI_REPLY = "Sure, I can help with that. What is your account number?"
+
+class FakeWebSocket:
+    """Records every frame the handler sends, decoded from JSON"""
+
+    def __init__(self):
+        self.frames = []
+        self.closed_with = None
+
+    async def accept(self):
+        pass
+
+    async def send_text(self, text: str):
+        self.frames.append(json.loads(text))
+
+    async def close(self, code: int = 1000, reason: str = None):
+        self.closed_with = code
+
+def spoken_text(frame: dict) -> str:
+    """The fake TTS encodes the text itself as the audio, so frames can be read back"""
+    return base64.b64decode(frame["audio_b64"]).decode()
+
+def speech_pcm(duration_ms: int) -> bytes:
+    """Amplitude-modulated tone that WebRTC VAD classifies as speech"""
+    t = np.arange(8 * duration_ms) / 8000
+    tone = np.sin(2 * np.pi * 300 * t) * 8000 * (1 + np.sin(2 * np.pi * 3 * t))
+    return tone.astype('<i2').tobytes()
+
+def audio_message(pcm: bytes, message_id: int) -> str:
+    """Teler-style inbound audio frame"""
+    return json.dumps({
+        "type": "audio",
+        "stream_id": "stream-1",
+        "message_id": message_id,
+        "data": {"audio_b64": base64.b64encode(pcm).decode()}
+    })
+
+def stub_services(stt_calls: list, tts_calls: list) -> ExitStack:
+    """Replace the Sarvam, Ollama, database and webhook calls with in-process fakes"""
+    async def text_to_speech(text, language, speaker):
+        tts_calls.append(text)
+        await asyncio.sleep(0.01)
+        return base64.b64encode(text.encode()).decode()
+
+    async def text_to_speech_stream(sentences, language, speaker):
+        for sentence in sentences:
+            yield base64.b64encode(sentence.encode()).decode()
+
+    async def speech_to_text_pcm(audio_pcm, language):
+        stt_calls.append(len(audio_pcm))
+        return {'transcript': USER_TRANSCRIPT, 'language': language}
+
+    async def detect_language_from_text(text):
+        return None
+
+    async def generate_conversation_response(context):
+        return AI_REPLY
+
+    stack = ExitStack()
+    for target, name, value in (
+        (wh.sarvam_service, 'text_to_speech', text_to_speech),
+        (wh.sarvam_service, 'text_to_speech_stream', text_to_speech_stream),
+        (wh.sarvam_service, 'speech_to_text_pcm', speech_to_text_pcm),
+        (wh.sarvam_service, 'detect_language_from_text', detect_language_from_text),
+        (wh.ollama_service, 'is_available', lambda: True),
+        (wh.ollama_service, 'generate_conversation_response', generate_conversation_response),
+        (wh.database_service, 'is_available', lambda: False),
+        (wh.webhook_service, 'is_configured', lambda: False),
+    ):
+        stack.enter_context(mock.patch.object(target, name, value))
+    return stack
+
+def test_utterance_is_transcribed_and_answered_in_order():
+    """Greeting, then end of utterance -> STT -> reply, with increasing chunk ids"""
+    stt_calls, tts_calls = [], []
+
+    async def scenario():
+        handler = TelerWebSocketHandler()
+        ws = FakeWebSocket()
+        connection_id = await handler.connect(ws)
+        conn = handler.connections[connection_id]
+
+        await handler.handle_incoming_message(ws, json.dumps({"type": "start", "call_id": "call-1", "stream_id": "stream-1"}), connection_id)
+
+        # 1s of speech then 700ms of silence, in 20ms frames (VAD hangover is 500ms)
+        audio = speech_pcm(1000) + bytes(16 * 700)
+        for message_id, offset in enumerate(range(0, len(audio), 320)):
+            await handler.handle_incoming_message(ws, audio_message(audio[offset:offset + 320], message_id), connection_id)
+
+        await asyncio.wait_for(conn.outbound.join(), timeout=2)
+        handler.disconnect(connection_id)
+        handler.silence_ticker.cancel()
+        return ws, conn
+
+    with stub_services(stt_calls, tts_calls):
+        ws, conn = asyncio.run(scenario())
+
+    assert len(stt_calls) == 1 and stt_calls[0] > 0
+    assert [frame["type"] for frame in ws.frames] == ["audio", "audio", "audio"]
+    assert [frame["chunk_id"] for frame in ws.frames] == [1, 2, 3]
+    assert [spoken_text(frame) for frame in ws.frames] == [
+        wh.DEFAULT_GREETING,
+        "Sure, I can help with that.",
+        "What is your account number?",
+    ]
+    assert [turn["role"] for turn in conn.conversation] == ["user", "assistant"]
+    assert conn.waiting_for_user and not conn.is_processing
+
+def test_silence_warnings_then_farewell_and_close():
+    """Two warnings at the silence deadline, then the farewell and a close"""
+    stt_calls, tts_calls = [], []
+
+    async def scenario():
+        handler = TelerWebSocketHandler()
+        ws = FakeWebSocket()
+        connection_id = await handler.connect(ws)
+        conn = handler.connections[connection_id]
+        conn.last_user_speech = wh.time.monotonic()
+
+        await handler._start_silence_monitoring(connection_id)
+        for _ in range(100):
+            if ws.closed_with is not None:
+                break
+            await asyncio.sleep(0.05)
+        handler.silence_ticker.cancel()
+        return ws, conn
+
+    with stub_services(stt_calls, tts_calls), \
+            mock.patch.object(wh, 'SILENCE_TIMEOUT_SECONDS', 0.1), \
+            mock.patch.object(wh, 'FAREWELL_PLAYBACK_TIMEOUT_SECONDS', 0.1):
+        ws, conn = asyncio.run(scenario())
+
+    assert [spoken_text(frame) for frame in ws.frames] == [
+        wh.FIRST_SILENCE_WARNINGS['en-IN'],
+        wh.FINAL_SILENCE_WARNINGS['en-IN'],
+        wh.FAREWELL_MESSAGES['en-IN'],
+    ]
+    assert [frame["chunk_id"] for frame in ws.frames] == [1, 2, 3]
+    assert conn.call_ended and conn.disconnect_reason == 'inactivity'
+    assert ws.closed_with is not None
+
+def test_stalled_client_is_closed_instead_of_buffering():
+    """A client that stops reading fills the bounded outbound queue and gets closed with 1011"""
+    class StalledWebSocket(FakeWebSocket):
+        async def send_text(self, text: str):
+            await asyncio.Event().wait()
+
+    async def scenario():
+        handler = TelerWebSocketHandler()
+        ws = StalledWebSocket()
+        connection_id = await handler.connect(ws)
+        conn = handler.connections[connection_id]
+        for chunk_id in range(wh.OUTBOUND_QUEUE_MAX_FRAMES + 2):
+            conn.send(wh._interrupt_frame(chunk_id))
+        await asyncio.wait_for(conn.abort_task, timeout=1)
+        await asyncio.gather(conn.writer_task, return_exceptions=True)
+        handler.disconnect(connection_id)
+        handler.silence_ticker.cancel()
+        return ws, conn
+
+    with stub_services([], []):
+        ws, conn = asyncio.run(scenario())
+
+    assert ws.closed_with == 1011
+    assert conn.writer_task.done()
+
+def test_concurrent_uncached_phrase_is_synthesized_once():
+    """Callers racing on the same uncached phrase share one TTS request"""
+    stt_calls, tts_calls = [], []
+
+    async def scenario():
+        handler = TelerWebSocketHandler()
+        return await asyncio.gather(*(
+            handler._get_cached_audio_frame(wh.FAREWELL_MESSAGES['en-IN'], 'en-IN', wh.DEFAULT_SPEAKER)
+            for _ in range(5)
+        )), handler
+
+    with stub_services(stt_calls, tts_calls):
+        frames, handler = asyncio.run(scenario())
+
+    assert tts_calls == [wh.FAREWELL_MESSAGES['en-IN']]
+    assert len(set(frames)) == 1 and frames[0] is not None
+    assert not handler.tts_pending
+
+def test_custom_greetings_do_not_evict_fixed_phrases():
+    """Only greetings are capped; warmed warnings and farewells stay cached"""
+    stt_calls, tts_calls = [], []
+
+    async def scenario():
+        handler = TelerWebSocketHandler()
+        await handler.warm_tts_cache()
+        warmed = len(tts_calls)
+        for n in range(wh.GREETING_TTS_CACHE_SIZE + 20):
+            await handler._get_cached_audio_frame(f"Hello caller {n}!", 'en-IN', wh.DEFAULT_SPEAKER)
+        del tts_calls[:]
+        for text, language in ((wh.FIRST_SILENCE_WARNINGS['hi-IN'], 'hi-IN'),
+                               (wh.FAREWELL_MESSAGES['ta-IN'], 'ta-IN'),
+                               (wh.DEFAULT_GREETING, 'en-IN')):
+            await handler._get_cached_audio_frame(text, language, wh.DEFAULT_SPEAKER)
+        return handler, warmed
+
+    with stub_services(stt_calls, tts_calls):
+        handler, warmed = asyncio.run(scenario())
+
+    assert tts_calls == []
+    assert len(handler.tts_cache) == warmed
+    assert len(handler.greeting_tts_cache) == wh.GREETING_TTS_CACHE_SIZE
+
+def test_utterance_end_does_not_depend_on_chunk_size():
+    """Partial VAD frames are carried across chunks, and each detector has its own VAD"""
+    audio = bytes(16 * 200) + speech_pcm(1000) + bytes(16 * 700)
+    outcomes = set()
+    for chunk_size in (160, 320, 333, 480, 1000):
+        detector = vad_processor.create_utterance_detector()
+        assert detector.vad is not vad_processor.vad
+        for offset in range(0, len(audio), chunk_size):
+            if detector.process(audio[offset:offset + chunk_size]):
+                break
+        assert detector.utterance_ended
+        outcomes.add((detector.speech_ms, detector.silence_ms))
+    # The same frames were classified whatever the chunking
+    assert len(outcomes) == 1
+
+if __name__ == "__main__":
+    for test in (
+        test_utterance_is_transcribed_and_answered_in_order,
+        test_silence_warnings_then_farewell_and_close,
+        test_stalled_client_is_closed_instead_of_buffering,
+        test_concurrent_uncached_phrase_is_synthesized_once,
+        test_custom_greetings_do_not_evict_fixed_phrases,
+        test_utterance_end_does_not_depend_on_chunk_size,
+    ):
+        test()
+        print(f"✅ {test.__name__}")
+    print("\n🏁 WebSocket handler tests completed!")
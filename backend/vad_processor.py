@@ -25,6 +25,7 @@ class VADProcessor:
             aggressiveness: VAD aggressiveness level (0-3)
                            0 = least aggressive, 3 = most aggressive
         """
+        self.aggressiveness = aggressiveness
         self.vad = webrtcvad.Vad(aggressiveness)
         self.sample_rate = 8000  # WebRTC VAD supports 8000, 16000, 32000, 48000 Hz
         self.frame_duration_ms = 30  # WebRTC VAD supports 10, 20, 30 ms frames
@@ -44,8 +45,23 @@ class VADProcessor:
             True if speech is detected, False otherwise
         """
         try:
-            # Decode base64 audio
             audio_data = base64.b64decode(audio_b64)
+        except Exception as e:
+            logger.error(f"Error in VAD processing: {e}")
+            return True
+        return self.has_speech_pcm(audio_data)
+
+    def has_speech_pcm(self, audio_data: bytes) -> bool:
+        """
+        Check if raw PCM audio contains speech using WebRTC VAD
+        
+        Args:
+            audio_data: Raw audio data (16-bit PCM, mono, 8kHz)
+            
+        Returns:
+            True if speech is detected, False otherwise
+        """
+        try:
             logger.debug(f"VAD processing audio chunk: {len(audio_data)} bytes")
             
             # Validate audio data length
@@ -116,6 +132,19 @@ class VADProcessor:
         
         return frames
     
+    def create_utterance_detector(self, min_speech_ms: int = 150, hangover_ms: int = 500) -> 'UtteranceDetector':
+        """
+        Create a streaming end-of-utterance detector with its own VAD and this processor's settings
+        
+        Args:
+            min_speech_ms: Consecutive speech needed before an utterance starts
+            hangover_ms: Trailing non-speech that ends an utterance
+            
+        Returns:
+            New UtteranceDetector for one audio stream
+        """
+        return UtteranceDetector(self, min_speech_ms, hangover_ms)
+    
     def get_speech_segments(self, audio_b64: str, min_speech_duration_ms: int = 100) -> List[Tuple[int, int]]:
         """
         Get speech segments from audio chunk
@@ -129,6 +158,23 @@ class VADProcessor:
         """
         try:
             audio_data = base64.b64decode(audio_b64)
+        except Exception as e:
+            logger.error(f"Error finding speech segments: {e}")
+            return []
+        return self.get_speech_segments_pcm(audio_data, min_speech_duration_ms)
+
+    def get_speech_segments_pcm(self, audio_data: bytes, min_speech_duration_ms: int = 100) -> List[Tuple[int, int]]:
+        """
+        Get speech segments from raw PCM audio
+        
+        Args:
+            audio_data: Raw 16-bit PCM audio data
+            min_speech_duration_ms: Minimum duration for a speech segment
+            
+        Returns:
+            List of (start_ms, end_ms) tuples for speech segments
+        """
+        try:
             frames = self._split_into_frames(audio_data)
             
             if not frames:
@@ -188,16 +234,39 @@ class VADProcessor:
             Base64 encoded audio with only speech segments, or None if no speech
         """
         try:
-            segments = self.get_speech_segments(audio_b64)
+            audio_data = base64.b64decode(audio_b64)
+        except Exception as e:
+            logger.error(f"Error filtering speech audio: {e}")
+            return audio_b64  # Return original if filtering fails
+
+        speech_data = self.filter_speech_pcm(audio_data)
+        if not speech_data:
+            return None
+        if speech_data is audio_data:
+            return audio_b64
+
+        # Encode back to base64
+        return base64.b64encode(speech_data).decode('utf-8')
+
+    def filter_speech_pcm(self, audio_data: bytes) -> Optional[bytes]:
+        """
+        Filter raw PCM audio to keep only speech segments
+        
+        Args:
+            audio_data: Raw 16-bit PCM audio data
+            
+        Returns:
+            PCM audio with only speech segments, or None if no speech
+        """
+        try:
+            segments = self.get_speech_segments_pcm(audio_data)
             
             if not segments:
                 logger.debug("No speech segments found, returning None")
                 return None
             
-            audio_data = base64.b64decode(audio_b64)
-            
             # Extract speech segments
-            speech_data = b''
+            speech_parts = []
             bytes_per_ms = (self.sample_rate * 2) // 1000  # 16 bytes per ms at 8kHz 16-bit
             
             for start_ms, end_ms in segments:
@@ -209,21 +278,19 @@ class VADProcessor:
                 end_byte = min(end_byte, len(audio_data))
                 
                 if start_byte < end_byte:
-                    speech_data += audio_data[start_byte:end_byte]
+                    speech_parts.append(audio_data[start_byte:end_byte])
             
+            speech_data = b''.join(speech_parts)
             if not speech_data:
                 return None
             
-            # Encode back to base64
-            filtered_b64 = base64.b64encode(speech_data).decode('utf-8')
-            
             logger.debug(f"Filtered audio: {len(audio_data)} -> {len(speech_data)} bytes ({len(segments)} segments)")
             
-            return filtered_b64
+            return speech_data
             
         except Exception as e:
             logger.error(f"Error filtering speech audio: {e}")
-            return audio_b64  # Return original if filtering fails
+            return audio_data  # Return original if filtering fails
     
     def get_vad_stats(self, audio_b64: str) -> dict:
         """
@@ -237,6 +304,25 @@ class VADProcessor:
         """
         try:
             audio_data = base64.b64decode(audio_b64)
+        except Exception as e:
+            logger.error(f"Error getting VAD stats: {e}")
+            return {
+                'error': str(e),
+                'has_speech': True  # Default to True on error
+            }
+        return self.get_vad_stats_pcm(audio_data)
+
+    def get_vad_stats_pcm(self, audio_data: bytes) -> dict:
+        """
+        Get detailed VAD statistics for raw PCM audio
+        
+        Args:
+            audio_data: Raw 16-bit PCM audio data
+            
+        Returns:
+            Dictionary with VAD statistics
+        """
+        try:
             frames = self._split_into_frames(audio_data)
             
             if not frames:
@@ -279,5 +365,105 @@ class VADProcessor:
                 'has_speech': True  # Default to True on error
             }
 
+class UtteranceDetector:
+    """
+    Streaming end-of-utterance detector for one audio stream.
+
+    Audio is fed as it arrives and classified one VAD frame at a time; an
+    utterance has ended once at least min_speech_ms of consecutive speech has
+    been followed by hangover_ms of non-speech.
+    """
+
+    __slots__ = ('vad', 'sample_rate', 'frame_duration_ms', 'bytes_per_frame',
+                 'min_speech_ms', 'hangover_ms', '_pending', 'speech_ms',
+                 'silence_ms', 'in_speech', 'utterance_ended')
+
+    def __init__(self, processor: 'VADProcessor', min_speech_ms: int = 150, hangover_ms: int = 500):
+        """
+        Args:
+            processor: VAD processor whose aggressiveness and frame settings are used
+            min_speech_ms: Consecutive speech needed before an utterance starts
+            hangover_ms: Trailing non-speech that ends an utterance
+        """
+        # WebRTC VAD adapts to the audio it sees, so each stream gets its own
+        # instance rather than sharing the processor's (which worker threads use)
+        self.vad = webrtcvad.Vad(processor.aggressiveness)
+        self.sample_rate = processor.sample_rate
+        self.frame_duration_ms = processor.frame_duration_ms
+        self.bytes_per_frame = processor.bytes_per_frame
+        self.min_speech_ms = min_speech_ms
+        self.hangover_ms = hangover_ms
+        self.reset()
+
+    def reset(self):
+        """Forget all state (call whenever the buffered audio is consumed)"""
+        self._pending = bytearray()  # Partial frame carried over to the next chunk
+        self.speech_ms = 0
+        self.silence_ms = 0
+        self.in_speech = False
+        self.utterance_ended = False
+
+    def process(self, audio_data: bytes) -> bool:
+        """
+        Classify the complete frames in newly received audio
+
+        Args:
+            audio_data: Raw 16-bit PCM audio, any length (partial frames are carried over)
+
+        Returns:
+            True once the current utterance has ended (stays True until reset)
+        """
+        if self.utterance_ended:
+            return True
+
+        # Frames are classified straight out of the incoming chunk (no copies);
+        # only a partial frame at either end goes through the small pending buffer
+        data = memoryview(audio_data)
+        frame_bytes = self.bytes_per_frame
+        pending = self._pending
+        if pending:
+            needed = frame_bytes - len(pending)
+            pending += data[:needed]
+            data = data[needed:]
+            if len(pending) < frame_bytes:
+                return False
+            ended = self._classify_frame(pending)
+            pending.clear()
+            if ended:
+                return True
+
+        usable = len(data) - len(data) % frame_bytes
+        for offset in range(0, usable, frame_bytes):
+            if self._classify_frame(data[offset:offset + frame_bytes]):
+                return True
+        pending += data[usable:]
+        return False
+
+    def _classify_frame(self, frame) -> bool:
+        """Run the VAD on one frame and update the utterance state; True once it has ended"""
+        try:
+            is_speech = self.vad.is_speech(frame, self.sample_rate)
+        except Exception as e:
+            logger.debug(f"VAD error on frame: {e}")
+            return False
+
+        frame_ms = self.frame_duration_ms
+        if is_speech:
+            self.speech_ms += frame_ms
+            self.silence_ms = 0
+            if not self.in_speech and self.speech_ms >= self.min_speech_ms:
+                self.in_speech = True
+        elif self.in_speech:
+            self.silence_ms += frame_ms
+            if self.silence_ms >= self.hangover_ms:
+                self.utterance_ended = True
+                logger.debug(f"End of utterance after {self.speech_ms}ms of speech")
+                return True
+        else:
+            # Require consecutive speech frames to start an utterance
+            self.speech_ms = 0
+        return False
+
+
 # Global VAD processor instance
 vad_processor = VADProcessor(aggressiveness=1)  # Lower aggressiveness for better phone call detection
@@ -2,15 +2,24 @@
 """
 WebSocket handler for Teler audio streaming
 Implements bidirectional audio streaming between Teler and the application
+
+Runs on whatever loop uvicorn provides; fastapi_app selects uvloop when it is
+installed (uvicorn[standard]), which is what the many small awaits here benefit from.
 """
 
 import json
 import logging
 import asyncio
-import base64
-import wave
-import io
-from typing import Dict, Any, Optional
+import heapq
+import itertools
+import random
+import re
+import time
+import traceback
+from collections import deque
+from types import MappingProxyType
+from typing import Dict, Any, Mapping, Optional, Tuple, Union
+import numpy as np
 from fastapi import WebSocket, WebSocketDisconnect
 from datetime import datetime, timedelta
 from sarvam_service import sarvam_service
@@ -22,65 +31,444 @@ import psycopg2
 from psycopg2.extras import RealDictCursor
 import os
 
+# pybase64 (SIMD-accelerated) is a drop-in for the stdlib module on the audio path
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
+
+# orjson parses the large base64 audio frames considerably faster; its
+# JSONDecodeError subclasses json.JSONDecodeError, so error handling is shared
+try:
+    import orjson
+    _json_loads = orjson.loads
+
+    def _json_dumps(obj: Any) -> str:
+        return orjson.dumps(obj).decode()
+except ImportError:
+    _json_loads = json.loads
+    _json_dumps = json.dumps
+
 logger = logging.getLogger(__name__)
 
+# Seconds of user silence before a warning is sent (and between checks)
+SILENCE_TIMEOUT_SECONDS = 30
+
+# Frames a connection may have waiting for its writer; a client that lets this
+# many pile up has stopped reading and is disconnected rather than buffered for
+OUTBOUND_QUEUE_MAX_FRAMES = 64
+
+# How long shutdown waits for queued transcripts to reach the database and webhook
+TRANSCRIPT_FLUSH_TIMEOUT_SECONDS = 30.0
+
+# Upper bound on waiting for the client to acknowledge farewell playback
+FAREWELL_PLAYBACK_TIMEOUT_SECONDS = 5.0
+
+# Audio with no speech in it is flushed after this long
+IDLE_AUDIO_FLUSH_MS = 3000
+
+# An utterance still in progress after this long is processed anyway
+MAX_UTTERANCE_MS = 15000
+
+# 16-bit mono PCM at 8kHz; each connection preallocates room for one full utterance
+PCM_BYTES_PER_MS = 16
+MAX_UTTERANCE_BYTES = MAX_UTTERANCE_MS * PCM_BYTES_PER_MS
+
+# Buffers below either level are treated as silence without running the VAD
+SILENCE_PEAK_THRESHOLD = 300
+SILENCE_RMS_THRESHOLD = 50
+
+# Transcripts longer than this are treated as conversation, not a request to hang up
+END_CALL_MAX_TEXT_LENGTH = 80
+
+# End call phrases in multiple languages
+_ASCII_END_PHRASES = (
+    # English
+    "goodbye", "bye", "end call", "hang up", "disconnect", "that's all",
+    "nothing else", "no more", "i'm done", "thank you bye", "thanks bye",
+    "end the call", "finish the call", "bye bye", "good bye",
+)
+
+_INDIC_END_PHRASES = (
+    # Hindi
+    "धन्यवाद", "अलविदा", "नमस्ते", "कॉल खत्म करो", "कॉल बंद करो",
+    "बस इतना ही", "और कुछ नहीं", "काफी है", "हो गया",
+    # Bengali
+    "ধন্যবাদ", "বিদায়", "কল শেষ করুন", "যথেষ্ট",
+    # Gujarati
+    "આભાર", "ગુડબાય", "કૉલ બંધ કરો", "બસ",
+    # Kannada
+    "ಧನ್ಯವಾದ", "ವಿದಾಯ", "ಕರೆ ಮುಗಿಸಿ", "ಸಾಕು",
+    # Malayalam
+    "നന്ദി", "വിട", "കോൾ അവസാനിപ്പിക്കുക", "മതി",
+    # Marathi ("धन्यवाद" is already listed under Hindi)
+    "निरोप", "कॉल बंद करा", "पुरे झाले",
+    # Odia
+    "ଧନ୍ୟବାଦ", "ଗୁଡବାଇ", "କଲ୍ ଶେଷ କରନ୍ତୁ",
+    # Punjabi
+    "ਧੰਨਵਾਦ", "ਅਲਵਿਦਾ", "ਕਾਲ ਖਤਮ ਕਰੋ",
+    # Tamil
+    "நன்றி", "குட்பை", "அழைப்பை முடிக்கவும்", "போதும்",
+    # Telugu
+    "ధన్యవాదాలు", "వీడ్కోలు", "కాల్ ముగించు", "చాలు",
+)
+
+_ALL_END_PHRASES = _INDIC_END_PHRASES + _ASCII_END_PHRASES
+
+# Each phrase list as one alternation, so a transcript is scanned once rather than once per phrase
+_ASCII_END_CALL_RE = re.compile('|'.join(map(re.escape, _ASCII_END_PHRASES)))
+_END_CALL_RE = re.compile('|'.join(map(re.escape, _ALL_END_PHRASES)))
+
+# Common filler words that on their own are not meaningful speech
+FILLER_WORDS = frozenset({'so', 'um', 'uh', 'hmm', 'ah', 'er', 'well', 'and', 'the', 'but', 'oh'})
+
+# TTS voice (Sarvam AI speaker name); 'meera' covers every supported language
+DEFAULT_SPEAKER = 'meera'
+
+# Greeting used when no custom greeting is configured
+DEFAULT_GREETING = "Hello! Welcome to the AdrshyamAI Help Center. How can I assist you today?"
+
+# Synthesized per-user custom greetings kept in memory, oldest evicted first.
+# The fixed phrases below have their own cache, which never evicts.
+GREETING_TTS_CACHE_SIZE = 128
+
+# Spoken after a language switch request
+LANGUAGE_SWITCH_CONFIRMATIONS = {
+    'en-IN': "I will now speak in English. How can I help you?",
+    'hi-IN': "मैं अब हिंदी में बोलूंगी। मैं आपकी कैसे मदद कर सकती हूं?",
+    'bn-IN': "আমি এখন বাংলায় কথা বলব। আমি আপনাকে কিভাবে সাহায্য করতে পারি?",
+    'gu-IN': "હું હવે ગુજરાતીમાં બોલીશ. હું તમારી કેવી રીતે મદદ કરી શકું?",
+    'kn-IN': "ನಾನು ಈಗ ಕನ್ನಡದಲ್ಲಿ ಮಾತನಾಡುತ್ತೇನೆ. ನಾನು ನಿಮಗೆ ಹೇಗೆ ಸಹಾಯ ಮಾಡಬಹುದು?",
+    'ml-IN': "ഞാൻ ഇപ്പോൾ മലയാളത്തിൽ സംസാരിക്കും. ഞാൻ നിങ്ങളെ എങ്ങനെ സഹായിക്കും?",
+    'mr-IN': "मी आता मराठीत बोलेन. मी तुम्हाला कशी मदत करू शकते?",
+    'or-IN': "ମୁଁ ବର୍ତ୍ତମାନ ଓଡ଼ିଆରେ କହିବି। ମୁଁ ଆପଣଙ୍କୁ କିପରି ସାହାଯ୍ୟ କରିପାରିବି?",
+    'pa-IN': "ਮੈਂ ਹੁਣ ਪੰਜਾਬੀ ਵਿੱਚ ਬੋਲਾਂਗੀ। ਮੈਂ ਤੁਹਾਡੀ ਕਿਵੇਂ ਮਦਦ ਕਰ ਸਕਦੀ ਹਾਂ?",
+    'ta-IN': "நான் இப்போது தமிழில் பேசுவேன். நான் உங்களுக்கு எப்படி உதவ முடியும்?",
+    'te-IN': "నేను ఇప్పుడు తెలుగులో మాట్లాడతాను. నేను మీకు ఎలా సహాయం చేయగలను?"
+}
+
+# Multi-language silence warnings (first, then final before hanging up)
+FIRST_SILENCE_WARNINGS = {
+    'en-IN': "Are you there? Please speak.",
+    'hi-IN': "क्या आप वहाँ हैं? कृपया बोलें।",
+    'bn-IN': "আপনি কি সেখানে আছেন? অনুগ্রহ করে কথা বলুন।",
+    'gu-IN': "શું તમે ત્યાં છો? કૃપા કરીને બોલો.",
+    'kn-IN': "ನೀವು ಅಲ್ಲಿದ್ದೀರಾ? ದಯವಿಟ್ಟು ಮಾತನಾಡಿ.",
+    'ml-IN': "നിങ്ങൾ അവിടെ ഉണ്ടോ? ദയവായി സംസാരിക്കൂ.",
+    'mr-IN': "तुम्ही तिथे आहात का? कृपया बोला.",
+    'or-IN': "ଆପଣ ସେଠାରେ ଅଛନ୍ତି କି? ଦୟାକରି କୁହନ୍ତୁ।",
+    'pa-IN': "ਕੀ ਤੁਸੀਂ ਉਥੇ ਹੋ? ਕਿਰਪਾ ਕਰਕੇ ਬੋਲੋ।",
+    'ta-IN': "நீங்கள் அங்கே இருக்கிறீர்களா? தயவுசெய்து பேசுங்கள்.",
+    'te-IN': "మీరు అక్కడ ఉన్నారా? దయచేసి మాట్లాడండి."
+}
+
+FINAL_SILENCE_WARNINGS = {
+    'en-IN': "I'm waiting for you. Anything else you'd like to say?",
+    'hi-IN': "मैं आपका इंतज़ार कर रहा हूँ। कुछ और कहना चाहते हैं?",
+    'bn-IN': "আমি আপনার জন্য অপেক্ষা করছি। আর কিছু বলতে চান?",
+    'gu-IN': "હું તમારી રાહ જોઉં છું. બીજું કંઈ કહેવા માંગો છો?",
+    'kn-IN': "ನಾನು ನಿಮಗಾಗಿ ಕಾಯುತ್ತಿದ್ದೇನೆ. ಇನ್ನೇನಾದರೂ ಹೇಳಲು ಬಯಸುತ್ತೀರಾ?",
+    'ml-IN': "ഞാൻ നിങ്ങൾക്കായി കാത്തിരിക്കുന്നു. മറ്റെന്തെങ്കിലും പറയാനുണ്ടോ?",
+    'mr-IN': "मी तुमची वाट पाहत आहे. आणखी काही सांगायचे आहे का?",
+    'or-IN': "ମୁଁ ଆପଣଙ୍କ ପାଇଁ ଅପେକ୍ଷା କରୁଛି। ଆଉ କିଛି କହିବାକୁ ଚାହୁଁଛନ୍ତି କି?",
+    'pa-IN': "ਮੈਂ ਤੁਹਾਡੀ ਉਡੀਕ ਕਰ ਰਿਹਾ ਹਾਂ। ਕੁਝ ਹੋਰ ਕਹਿਣਾ ਚਾਹੁੰਦੇ ਹੋ?",
+    'ta-IN': "நான் உங்களுக்காக காத்திருக்கிறேன். வேறு ஏதாவது சொல்ல விரும்புகிறீர்களா?",
+    'te-IN': "నేను మీ కోసం ఎదురు చూస్తున్నాను. ఇంకా ఏదైనా చెప్పాలనుకుంటున్నారా?"
+}
+
+# Multi-language goodbye messages
+FAREWELL_MESSAGES = {
+    'en-IN': "Thank you for calling. Have a great day. Goodbye!",
+    'hi-IN': "कॉल करने के लिए धन्यवाद। आपका दिन शुभ हो। नमस्ते!",
+    'bn-IN': "কল করার জন্য ধন্যবাদ। আপনার দিন শুভ হোক। বিদায়!",
+    'gu-IN': "કૉલ કરવા બદલ આભાર. તમારો દિવસ સારો રહે. ગુડબાય!",
+    'kn-IN': "ಕರೆ ಮಾಡಿದ್ದಕ್ಕಾಗಿ ಧನ್ಯವಾದಗಳು. ನಿಮ್ಮ ದಿನ ಶುಭವಾಗಲಿ. ವಿದಾಯ!",
+    'ml-IN': "വിളിച്ചതിന് നന്ദി. നിങ്ങളുടെ ദിവസം നല്ലതായിരിക്കട്ടെ. വിട!",
+    'mr-IN': "कॉल केल्याबद्दल धन्यवाद. तुमचा दिवस चांगला जावो. निरोप!",
+    'or-IN': "କଲ କରିବା ପାଇଁ ଧନ୍ୟବାଦ। ଆପଣଙ୍କ ଦିନ ଭଲ ହେଉ। ଗୁଡବାଇ!",
+    'pa-IN': "ਕਾਲ ਕਰਨ ਲਈ ਧੰਨਵਾਦ। ਤੁਹਾਡਾ ਦਿਨ ਚੰਗਾ ਰਹੇ। ਅਲਵਿਦਾ!",
+    'ta-IN': "அழைத்ததற்கு நன்றி. உங்கள் நாள் இனிதாக அமையட்டும். குட்பை!",
+    'te-IN': "కాల్ చేసినందుకు ధన్యవాదాలు. మీ రోజు మంచిగా ఉండాలి. వీడ్కోలు!"
+}
+
+# Fixed phrases: synthesized once per language and kept for the life of the process
+_FIXED_PHRASE_TABLES = (LANGUAGE_SWITCH_CONFIRMATIONS, FIRST_SILENCE_WARNINGS, FINAL_SILENCE_WARNINGS, FAREWELL_MESSAGES)
+_FIXED_PHRASES = frozenset([DEFAULT_GREETING] + [text for messages in _FIXED_PHRASE_TABLES for text in messages.values()])
+
+# Canned replies used while Ollama is unavailable
+FALLBACK_RESPONSES_EN = (
+    "Thank you. What else would you like to know?",
+    "I understand. Please continue.",
+    "That's interesting. What else?",
+    "Okay. What else would you like to say?",
+)
+
+FALLBACK_RESPONSES_HI = (
+    "धन्यवाद। आप और क्या जानना चाहते हैं?",
+    "मैं समझ गया। कृपया आगे बताएं।",
+    "यह दिलचस्प है। और क्या है?",
+    "अच्छा। आप और क्या कहना चाहते हैं?",
+)
+
+# Sentence boundaries (incl. the Devanagari danda) used to pipeline TTS per sentence
+_SENTENCE_SPLIT_RE = re.compile(r'(?<=[.!?।])\s+')
+
+# What send_text raises once the peer has gone: Starlette's disconnect, RuntimeError for a
+# send after close, and uvicorn's ClientDisconnected (an OSError). Anything else is a bug.
+_SEND_ERRORS = (WebSocketDisconnect, RuntimeError, OSError)
+
+# Outbound control frames, serialized once / from fixed templates
+_CLEAR_FRAME = '{"type": "clear"}'
+_INTERRUPT_FRAME_PREFIX = '{"type": "interrupt", "chunk_id": '
+
+_UTF8_BOM = b'\xef\xbb\xbf'
+
+def _parse_binary_json(frame: bytes) -> Optional[Dict[str, Any]]:
+    """
+    Parse a binary frame that carries a JSON message.
+
+    Args:
+        frame: Binary WebSocket frame
+
+    Returns:
+        The decoded message, or None if the frame is raw PCM audio
+    """
+    text = frame[3:] if frame.startswith(_UTF8_BOM) else frame
+    text = text.lstrip()  # Returns the same object when there is no leading whitespace
+    if text[:1] != b'{':
+        return None
+    # PCM can start with a '{' byte by chance, so only a successful parse counts as JSON
+    try:
+        data = _json_loads(text)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+def _interrupt_frame(chunk_id: int) -> str:
+    """Build an interrupt frame (chunk_id is an int, so no JSON encoding is needed)"""
+    return _INTERRUPT_FRAME_PREFIX + str(int(chunk_id)) + '}'
+
+def _audio_frame(audio_b64: str, chunk_id: int) -> str:
+    """
+    Build the outbound Teler audio frame without running json.dumps over the payload.
+
+    Base64 output only uses [A-Za-z0-9+/=], so it never needs JSON escaping and
+    can be spliced in directly; this avoids an extra scan and copy per chunk.
+    """
+    return '{"type": "audio", "audio_b64": "' + audio_b64 + '", "chunk_id": ' + str(int(chunk_id)) + '}'
+
+def _audio_frame_prefix(audio_b64: str) -> str:
+    """Everything of an audio frame up to its chunk_id, for audio that is sent repeatedly"""
+    return '{"type": "audio", "audio_b64": "' + audio_b64 + '", "chunk_id": '
+
+def _complete_audio_frame(frame_prefix: str, chunk_id: int) -> str:
+    """Finish a frame built by _audio_frame_prefix (one copy of the payload instead of several)"""
+    return frame_prefix + str(int(chunk_id)) + '}'
+
+class Connection:
+    """
+    All state for one Teler stream in a single slotted object, so the hot path
+    does one dict lookup per message and plain attribute loads after that.
+    """
+
+    # Fields persisted with the transcript (see to_dict)
+    CALL_STATE_FIELDS = (
+        'status', 'last_user_speech', 'last_ai_response', 'waiting_for_user',
+        'greeting_sent', 'call_ended', 'silence_warnings', 'max_silence_warnings',
+        'is_processing', 'warning_in_flight', 'last_meaningful_speech',
+        'current_language', 'detected_language', 'knowledge_base_id', 'disconnect_reason'
+    )
+
+    __slots__ = CALL_STATE_FIELDS + (
+        'websocket', 'stream_metadata', 'conversation', 'pcm_buf', 'pcm_spare', 'pcm_len',
+        'pcm_chunks', 'accumulated_ms',
+        'silence_deadline', 'silence_check', 'playback_events', 'closing_task',
+        'utterance_detector', 'outbound', 'writer_task', 'abort_task', 'chunk_ids'
+    )
+
+    def __init__(self, websocket: WebSocket):
+        self.websocket = websocket
+        self.stream_metadata: Optional[Dict[str, Any]] = None  # Set by the start message
+        self.conversation: list = []
+        # Buffered audio is written in place into a fixed-size buffer; the spare
+        # takes over while a previous utterance is still being processed. Both are
+        # allocated on first use, so a connected call that hasn't spoken holds neither
+        self.pcm_buf: Optional[bytearray] = None
+        self.pcm_spare: Optional[bytearray] = None
+        self.pcm_len: int = 0
+        self.pcm_chunks: int = 0  # Number of audio messages buffered
+        self.accumulated_ms: int = 0  # Running duration of the audio buffer
+        self.utterance_detector = vad_processor.create_utterance_detector()  # Streaming end-of-utterance VAD
+        self.silence_deadline: Optional[float] = None  # time.monotonic() when the next silence check is due
+        self.silence_check: Optional[asyncio.Task] = None  # Silence check (warning/hang-up) in progress
+        self.playback_events: Dict[int, asyncio.Event] = {}  # chunk_id -> playback_complete ack
+        self.closing_task: Optional[asyncio.Task] = None  # Deferred close after farewell playback
+        self.outbound: asyncio.Queue = asyncio.Queue(maxsize=OUTBOUND_QUEUE_MAX_FRAMES)  # Text frames waiting for the writer task
+        self.writer_task: Optional[asyncio.Task] = None  # Sole sender on the websocket
+        self.abort_task: Optional[asyncio.Task] = None  # Close of a stalled or broken connection
+        self.chunk_ids = itertools.count(1)  # Outbound audio chunk ids for this stream
+
+        self.status: str = 'connected'
+        self.last_user_speech: Optional[float] = None  # time.monotonic()
+        self.last_ai_response: Optional[float] = None  # time.monotonic()
+        self.waiting_for_user: bool = True
+        self.greeting_sent: bool = False
+        self.call_ended: bool = False
+        self.silence_warnings: int = 0
+        self.max_silence_warnings: int = 2
+        self.is_processing: bool = False
+        self.warning_in_flight: bool = False
+        self.last_meaningful_speech: Optional[str] = None
+        self.current_language: str = 'en-IN'
+        self.detected_language: Optional[str] = None
+        self.knowledge_base_id: Optional[str] = None
+        self.disconnect_reason: Optional[str] = None
+
+    def append_pcm(self, audio_data: bytes):
+        """Append raw PCM to the audio buffer, keeping only the newest MAX_UTTERANCE_BYTES"""
+        size = len(audio_data)
+        buf = self.pcm_buf
+        if buf is None:
+            buf = self.pcm_buf = bytearray(MAX_UTTERANCE_BYTES)
+        end = self.pcm_len + size
+        if end > MAX_UTTERANCE_BYTES:
+            if size >= MAX_UTTERANCE_BYTES:
+                audio_data = audio_data[size - MAX_UTTERANCE_BYTES:]
+                size = MAX_UTTERANCE_BYTES
+                self.pcm_len = 0
+            else:
+                # Rare: buffer full (e.g. the user talked over a long response); drop the oldest audio
+                drop = end - MAX_UTTERANCE_BYTES
+                buf[:self.pcm_len - drop] = buf[drop:self.pcm_len]
+                self.pcm_len -= drop
+            end = self.pcm_len + size
+        buf[self.pcm_len:end] = audio_data
+        self.pcm_len = end
+        self.pcm_chunks += 1
+
+    def take_pcm(self) -> memoryview:
+        """
+        Hand over the buffered audio and start a new, empty buffer.
+
+        Returns:
+            Read-only view of the buffered audio; it stays valid until the next
+            take_pcm() call, so it must not outlive processing of this utterance
+        """
+        if self.pcm_buf is None:
+            self.clear_audio()
+            return memoryview(b'')
+        audio = memoryview(self.pcm_buf)[:self.pcm_len].toreadonly()
+        # Never resized, so the view handed out stays valid while its buffer is the spare
+        if self.pcm_spare is None:
+            self.pcm_spare = bytearray(MAX_UTTERANCE_BYTES)
+        self.pcm_buf, self.pcm_spare = self.pcm_spare, self.pcm_buf
+        self.clear_audio()
+        return audio
+
+    def clear_audio(self):
+        """Discard the buffered audio and the streaming VAD state"""
+        self.pcm_len = 0
+        self.pcm_chunks = 0
+        self.accumulated_ms = 0
+        self.utterance_detector.reset()
+
+    def send(self, frame: str):
+        """Queue a text frame; the writer task sends frames in order, so callers never wait on the socket"""
+        try:
+            self.outbound.put_nowait(frame)
+        except asyncio.QueueFull:
+            # Dropping frames would cut audio mid-sentence; a client this far
+            # behind is treated as gone and the connection is closed instead
+            if self.abort_task is None:
+                logger.warning("Outbound queue full (%d frames), closing stalled connection", self.outbound.qsize())
+                self.abort_task = asyncio.create_task(self.abort())
+
+    async def abort(self, code: int = 1011):
+        """Stop the writer and close the socket; the receive loop then runs the normal disconnect"""
+        if self.writer_task is not None and self.writer_task is not asyncio.current_task():
+            self.writer_task.cancel()
+        try:
+            await self.websocket.close(code=code)
+        except _SEND_ERRORS:
+            pass
+
+    def cancel_silence_check(self):
+        """Disarm silence monitoring and cancel a check that is in progress"""
+        self.silence_deadline = None
+        if self.silence_check is not None:
+            self.silence_check.cancel()
+            self.silence_check = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Plain dict view, for persistence alongside the transcript"""
+        state = {name: getattr(self, name) for name in self.CALL_STATE_FIELDS}
+        # Monotonic timestamps mean nothing outside this process; store wall-clock times
+        wall_offset = time.time() - time.monotonic()
+        for name in ('last_user_speech', 'last_ai_response'):
+            if state[name] is not None:
+                state[name] = datetime.fromtimestamp(state[name] + wall_offset)
+        return state
+
+
 class TelerWebSocketHandler:
     """Handles WebSocket connections and audio streaming with Teler"""
-    
+
     def __init__(self):
-        self.active_connections: Dict[str, WebSocket] = {}
-        self.stream_metadata: Dict[str, Dict[str, Any]] = {}
-        self.chunk_counter = 1
-        self.conversation_history: Dict[str, list] = {}
-        self.call_states: Dict[str, Dict[str, Any]] = {}
-        self.silence_timers: Dict[str, asyncio.Task] = {}
-        self.audio_buffers: Dict[str, list] = {}  # Buffer audio chunks
-        self.processing_locks: Dict[str, asyncio.Lock] = {}  # Prevent concurrent processing
+        self.connections: Dict[str, Connection] = {}
+        self.active_streams: Dict[str, Dict[str, Any]] = {}  # connection_id -> stream metadata, for started streams
+        self.silence_ticker: Optional[asyncio.Task] = None  # Shared silence monitor for all connections
+        self.silence_heap: list = []  # (deadline, connection_id); entries not matching conn.silence_deadline are stale
+        self.silence_wakeup: Optional[asyncio.Event] = None  # Set when an earlier silence deadline is armed
+        self.silence_next_wakeup: Optional[float] = None  # When the ticker will next wake on its own (None = idle)
+        self.tts_cache: Dict[Tuple[str, str, str], str] = {}  # Fixed phrases: (text, language, speaker) -> audio frame prefix
+        self.greeting_tts_cache: Dict[Tuple[str, str, str], str] = {}  # Custom greetings, capped at GREETING_TTS_CACHE_SIZE
+        self.tts_pending: Dict[Tuple[str, str, str], asyncio.Future] = {}  # In-flight syntheses for uncached phrases
+        self.tts_warmup: Optional[asyncio.Task] = None  # Background warm_tts_cache() run (the loop only holds tasks weakly)
+        self.transcript_queue: Optional[asyncio.Queue] = None  # Finished calls awaiting DB save / webhook delivery
+        self.transcript_flusher: Optional[asyncio.Task] = None
         self.database_url = os.getenv('DATABASE_URL')
         self.connection = None
+        # Call history indexes owned by fastapi_app, injected via attach_call_history()
+        self.call_history: list = []
+        self.call_history_by_id: Dict[str, Dict[str, Any]] = {}
+        self.recent_kb_calls = deque()
+
+    def attach_call_history(self, call_history: list, call_history_by_id: Dict[str, Dict[str, Any]], recent_kb_calls: deque):
+        """Share the application's call history (and its indexes) with the handler"""
+        self.call_history = call_history
+        self.call_history_by_id = call_history_by_id
+        self.recent_kb_calls = recent_kb_calls
         
     async def connect(self, websocket: WebSocket, stream_id: str = None):
         """Accept WebSocket connection and store it"""
         await websocket.accept()
-        connection_id = stream_id or f"conn_{datetime.now().timestamp()}"
-        self.active_connections[connection_id] = websocket
-        self.conversation_history[connection_id] = []
-        self.audio_buffers[connection_id] = []
-        self.processing_locks[connection_id] = asyncio.Lock()
-        
-        # Initialize call state
-        self.call_states[connection_id] = {
-            'status': 'connected',
-            'last_user_speech': None,
-            'last_ai_response': None,
-            'waiting_for_user': True,
-            'greeting_sent': False,
-            'call_ended': False,
-            'silence_warnings': 0,
-            'max_silence_warnings': 2,
-            'is_processing': False,
-            'last_meaningful_speech': None,
-            'current_language': 'en-IN',
-            'detected_language': None,
-            'knowledge_base_id': None
-        }
+        connection_id = stream_id or f"conn_{time.time()}"
+        conn = Connection(websocket)
+        conn.writer_task = asyncio.create_task(self._writer_loop(conn, connection_id))
+        self.connections[connection_id] = conn
+
+        # One ticker serves every connection; it sleeps until the earliest deadline
+        if self.silence_ticker is None or self.silence_ticker.done():
+            self.silence_wakeup = asyncio.Event()
+            self.silence_next_wakeup = None
+            self.silence_ticker = asyncio.create_task(self._silence_tick_loop())
         
         logger.info(f"WebSocket connected: {connection_id}")
         return connection_id
     
     async def _save_call_transcript(self, connection_id: str):
-        """Save call transcript to database and send to webhook"""
+        """Build the call transcript and queue it for the database and webhook"""
         try:
-            conversation = self.conversation_history.get(connection_id, [])
-            call_state = self.call_states.get(connection_id, {})
-            stream_metadata = self.stream_metadata.get(connection_id, {})
+            conn = self.connections.get(connection_id)
+            conversation = conn.conversation if conn is not None else []
+            stream_metadata = (conn.stream_metadata if conn is not None else None) or {}
 
             if not conversation:
                 logger.info(f"No conversation history to save for {connection_id}")
                 return
 
             # Get disconnect reason
-            disconnect_reason = call_state.get('disconnect_reason', 'unknown')
+            disconnect_reason = conn.disconnect_reason or 'unknown'
 
             # Add disconnect reason to conversation history
             if disconnect_reason == 'user_disconnected':
@@ -107,13 +495,11 @@ class TelerWebSocketHandler:
             if not from_number or not to_number:
                 logger.info(f"from_number or to_number not in stream_metadata, looking in call_history for call_id: {call_id}")
                 try:
-                    from fastapi_app import call_history
-                    for call in call_history:
-                        if call.get('call_id') == call_id:
-                            from_number = from_number or call.get('from_number')
-                            to_number = to_number or call.get('to_number')
-                            logger.info(f"Found in call_history - from_number: {from_number}, to_number: {to_number}")
-                            break
+                    call = self.call_history_by_id.get(call_id)
+                    if call is not None:
+                        from_number = from_number or call.get('from_number')
+                        to_number = to_number or call.get('to_number')
+                        logger.info(f"Found in call_history - from_number: {from_number}, to_number: {to_number}")
                 except Exception as e:
                     logger.warning(f"Could not retrieve from call_history: {e}")
 
@@ -130,55 +516,137 @@ class TelerWebSocketHandler:
 
             logger.info(f"Saving call transcript for call_id: {call_id} (from: {from_number}, to: {to_number})")
 
-            # Save to database
-            if database_service.is_available():
-                # Update stream_metadata with the retrieved phone numbers for database save
-                updated_stream_metadata = stream_metadata.copy()
-                if from_number:
-                    updated_stream_metadata['from_number'] = from_number
-                if to_number:
-                    updated_stream_metadata['to_number'] = to_number
-
-                success = database_service.save_call_transcript(
-                    call_id=call_id,
-                    connection_id=connection_id,
-                    conversation=conversation,
-                    metadata=metadata,
-                    call_state=call_state,
-                    stream_metadata=updated_stream_metadata
-                )
-
-                if success:
-                    logger.info(f"Call transcript saved to database: {call_id}")
-                else:
-                    logger.warning(f"Failed to save call transcript to database: {call_id}")
-            else:
-                logger.warning("Database service not available, transcript not saved")
-
-            # Send to webhook if configured
-            if webhook_service.is_configured():
-                logger.info(f"Sending call transcript to webhook for call_id: {call_id}")
-                webhook_success = await webhook_service.send_transcript(
-                    call_id=call_id,
-                    conversation=conversation,
-                    metadata=metadata
-                )
-
-                if webhook_success:
-                    logger.info(f"Call transcript sent to webhook: {call_id}")
-                    # Mark as sent in database
-                    if database_service.is_available():
-                        database_service.mark_webhook_sent(call_id)
-                else:
-                    logger.warning(f"Failed to send call transcript to webhook: {call_id}")
-            else:
-                logger.debug("Webhook not configured, skipping webhook delivery")
+            # Update stream_metadata with the retrieved phone numbers for database save
+            updated_stream_metadata = stream_metadata.copy()
+            if from_number:
+                updated_stream_metadata['from_number'] = from_number
+            if to_number:
+                updated_stream_metadata['to_number'] = to_number
+
+            # Snapshot everything now: the connection state is freed as soon as we return
+            self._queue_transcript({
+                'call_id': call_id,
+                'connection_id': connection_id,
+                'conversation': list(conversation),
+                'metadata': metadata,
+                'call_state': conn.to_dict(),
+                'stream_metadata': updated_stream_metadata,
+            })
 
         except Exception as e:
             logger.error(f"Error saving call transcript: {e}")
-            import traceback
             logger.error(traceback.format_exc())
 
+    def _queue_transcript(self, transcript: Dict[str, Any]):
+        """Hand a finished call's transcript to the background flusher"""
+        if self.transcript_queue is None:
+            self.transcript_queue = asyncio.Queue()
+        self.transcript_queue.put_nowait(transcript)
+        self._ensure_transcript_flusher()
+
+    def _ensure_transcript_flusher(self):
+        """Start the flusher if it isn't running; it picks up whatever is already queued"""
+        if self.transcript_flusher is None or self.transcript_flusher.done():
+            self.transcript_flusher = asyncio.create_task(self._transcript_flush_loop())
+
+    async def stop_background_tasks(self):
+        """
+        Cancel the TTS warm-up, the silence ticker and each connection's writer and
+        silence check, and wait for them to finish (for shutdown, before the service
+        clients they use are closed).
+        """
+        tasks = [self.tts_warmup, self.silence_ticker]
+        for conn in self.connections.values():
+            tasks.extend((conn.writer_task, conn.silence_check))
+            conn.cancel_silence_check()
+        tasks = [task for task in tasks if task is not None and not task.done()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def flush_transcripts(self, timeout: float = TRANSCRIPT_FLUSH_TIMEOUT_SECONDS):
+        """
+        Wait for queued transcripts to be saved and delivered, then stop the flusher (for shutdown).
+
+        Args:
+            timeout: Longest to wait before giving up on what is still queued
+        """
+        queue = self.transcript_queue
+        if queue is None:
+            return
+
+        if queue.qsize():
+            logger.info(f"Flushing {queue.qsize()} queued call transcripts before shutdown")
+            self._ensure_transcript_flusher()
+        try:
+            await asyncio.wait_for(queue.join(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.error(f"Gave up flushing call transcripts after {timeout}s ({queue.qsize()} still queued)")
+        finally:
+            if self.transcript_flusher is not None:
+                self.transcript_flusher.cancel()
+
+    async def _transcript_flush_loop(self):
+        """
+        Persist queued transcripts and deliver them to the webhook, off the teardown path.
+        Whatever has piled up while the previous batch was in flight is taken in one go.
+        """
+        queue = self.transcript_queue
+        while True:
+            batch = [await queue.get()]
+            for _ in range(queue.qsize()):
+                batch.append(queue.get_nowait())
+            for transcript in batch:
+                try:
+                    await self._flush_transcript(transcript)
+                except Exception as e:
+                    logger.error(f"Error flushing call transcript {transcript['call_id']}: {e}")
+                    logger.error(traceback.format_exc())
+                finally:
+                    queue.task_done()
+
+    async def _flush_transcript(self, transcript: Dict[str, Any]):
+        """Save one transcript to the database and send it to the webhook"""
+        call_id = transcript['call_id']
+
+        # Save to database (psycopg2 blocks, so keep it off the event loop)
+        if database_service.is_available():
+            success = await asyncio.to_thread(
+                database_service.save_call_transcript,
+                call_id=call_id,
+                connection_id=transcript['connection_id'],
+                conversation=transcript['conversation'],
+                metadata=transcript['metadata'],
+                call_state=transcript['call_state'],
+                stream_metadata=transcript['stream_metadata']
+            )
+
+            if success:
+                logger.info(f"Call transcript saved to database: {call_id}")
+            else:
+                logger.warning(f"Failed to save call transcript to database: {call_id}")
+        else:
+            logger.warning("Database service not available, transcript not saved")
+
+        # Send to webhook if configured
+        if webhook_service.is_configured():
+            logger.info(f"Sending call transcript to webhook for call_id: {call_id}")
+            webhook_success = await webhook_service.send_transcript(
+                call_id=call_id,
+                conversation=transcript['conversation'],
+                metadata=transcript['metadata']
+            )
+
+            if webhook_success:
+                logger.info(f"Call transcript sent to webhook: {call_id}")
+                # Mark as sent in database
+                if database_service.is_available():
+                    await asyncio.to_thread(database_service.mark_webhook_sent, call_id)
+            else:
+                logger.warning(f"Failed to send call transcript to webhook: {call_id}")
+        else:
+            logger.debug("Webhook not configured, skipping webhook delivery")
+
     async def handle_disconnect(self, connection_id: str):
         """
         Handle WebSocket disconnection gracefully.
@@ -187,8 +655,8 @@ class TelerWebSocketHandler:
         logger.info(f"🔌 Handling disconnect for connection: {connection_id}")
 
         # Check if call has already been ended gracefully
-        call_state = self.call_states.get(connection_id, {})
-        call_already_ended = call_state.get('call_ended', False)
+        conn = self.connections.get(connection_id)
+        call_already_ended = conn is not None and conn.call_ended
 
         if call_already_ended:
             logger.info(f"✅ Call already ended gracefully for {connection_id}, skipping transcript save")
@@ -197,10 +665,10 @@ class TelerWebSocketHandler:
             logger.info(f"💾 User disconnected without ending call, saving transcript for {connection_id}")
 
             # Mark the disconnection reason in call state
-            if connection_id in self.call_states:
-                self.call_states[connection_id]['disconnect_reason'] = 'user_disconnected'
-                self.call_states[connection_id]['call_ended'] = True
-                self.call_states[connection_id]['status'] = 'disconnected'
+            if conn is not None:
+                conn.disconnect_reason = 'user_disconnected'
+                conn.call_ended = True
+                conn.status = 'disconnected'
 
             await self._save_call_transcript(connection_id)
 
@@ -209,69 +677,109 @@ class TelerWebSocketHandler:
 
     def disconnect(self, connection_id: str):
         """Remove WebSocket connection"""
-        if connection_id in self.active_connections:
-            del self.active_connections[connection_id]
+        conn = self.connections.pop(connection_id, None)
+        if conn is not None:
+            # Cancel a pending farewell close unless that is what is calling us
+            closing_task = conn.closing_task
+            if closing_task and closing_task is not asyncio.current_task():
+                closing_task.cancel()
 
-        if connection_id in self.conversation_history:
-            del self.conversation_history[connection_id]
+            # Cancel silence monitoring if active
+            conn.cancel_silence_check()
 
-        if connection_id in self.stream_metadata:
-            del self.stream_metadata[connection_id]
-
-        if connection_id in self.call_states:
-            del self.call_states[connection_id]
-
-        if connection_id in self.audio_buffers:
-            del self.audio_buffers[connection_id]
-
-        if connection_id in self.processing_locks:
-            del self.processing_locks[connection_id]
-
-        # Cancel silence timer if exists
-        if connection_id in self.silence_timers:
-            self.silence_timers[connection_id].cancel()
-            del self.silence_timers[connection_id]
+            # Frames still queued have nowhere to go
+            if conn.writer_task:
+                conn.writer_task.cancel()
+        self.active_streams.pop(connection_id, None)
 
         logger.info(f"WebSocket disconnected: {connection_id}")
     
-    async def handle_incoming_message(self, websocket: WebSocket, message: str, connection_id: str):
+    async def _writer_loop(self, conn: Connection, connection_id: str):
+        """Send the connection's queued frames one at a time, in order (every outbound frame goes through here)"""
+        queue = conn.outbound
+        send_text = conn.websocket.send_text
+        try:
+            while True:
+                frame = await queue.get()
+                try:
+                    await send_text(frame)
+                except _SEND_ERRORS as e:
+                    logger.error(f"Failed to send frame to {connection_id}: {e}")
+                finally:
+                    queue.task_done()
+        except asyncio.CancelledError:
+            logger.debug("Writer stopped for %s (%d frames unsent)", connection_id, queue.qsize())
+        except Exception as e:
+            # Nothing would ever drain the queue again; close so the call is torn down
+            logger.error(f"Writer failed for {connection_id}: {e}")
+            logger.error(traceback.format_exc())
+            await conn.abort()
+
+    async def handle_incoming_message(self, websocket: WebSocket, message: Union[str, bytes], connection_id: str):
         """
         Handle incoming messages from Teler
         
         Message types:
         - start: Stream metadata
         - audio: Audio chunk from Teler
+        - playback_complete: Client finished playing an audio chunk
+
+        Binary frames that do not parse as a JSON object are taken as raw 8kHz 16-bit PCM audio.
         """
         try:
-            # Check if call has ended - FIRST CHECK
-            call_state = self.call_states.get(connection_id, {})
-            if call_state.get('call_ended', False):
-                logger.debug(f"Ignoring message for ended call: {connection_id}")
-                return
-                
-            logger.info(f"connection_id type: {type(connection_id)}, value: {connection_id}")
-            data = json.loads(message)
+            conn = self.connections.get(connection_id)
+
+            if isinstance(message, bytes):
+                data = _parse_binary_json(message)
+                if data is None:
+                    # Raw binary frames carry PCM directly (no JSON envelope, no base64)
+                    if conn is None or conn.call_ended:
+                        logger.debug("🚫 Ignoring audio for ended call: %s", connection_id)
+                        return
+                    await self._buffer_audio(message, conn, connection_id)
+                    return
+            else:
+                data = _json_loads(message)
             message_type = data.get("type")
+
+            # Playback acks are still expected after the call has ended (farewell)
+            if message_type == "playback_complete":
+                if conn is not None:
+                    self._handle_playback_complete(data, conn, connection_id)
+                return
+
+            # Check if call has ended
+            if conn is not None and conn.call_ended:
+                logger.debug("Ignoring message for ended call: %s", connection_id)
+                return
             
-            logger.debug(f"Received WebSocket message type: {message_type} for connection: {connection_id}")
+            logger.debug("Received WebSocket message type: %s for connection: %s", message_type, connection_id)
             
             if message_type == "start":
                 await self._handle_start_message(data, connection_id)
             elif message_type == "audio":
-                await self._handle_audio_message(data, connection_id, websocket)
+                await self._handle_audio_message(data, conn, connection_id)
             else:
                 logger.warning(f"Unknown message type: {message_type}")
                 
         except json.JSONDecodeError as e:
             logger.error(f"Failed to parse JSON message: {e}")
-            logger.error(f"Raw message: {message[:200]}...")
+            logger.error("Raw message: %.200s...", message)
         except Exception as e:
             logger.error(f"Error handling message: {e}")
     
+    def _handle_playback_complete(self, data: Dict[str, Any], conn: Connection, connection_id: str):
+        """Wake up anyone waiting for the client to finish playing a chunk"""
+        chunk_id = data.get("chunk_id")
+        event = conn.playback_events.pop(chunk_id, None)
+        if event:
+            logger.debug(f"Playback complete for chunk {chunk_id} on {connection_id}")
+            event.set()
+
     async def _handle_start_message(self, data: Dict[str, Any], connection_id: str):
         """Handle start message with stream metadata"""
         logger.info(f"Stream started for connection {connection_id}")
-        logger.info(f"🔍 FULL START MESSAGE DATA: {json.dumps(data, indent=2)}")
+        logger.info("🔍 FULL START MESSAGE DATA: %s", data)
 
         call_id = data.get("call_id")
         stream_id = data.get("stream_id")
@@ -281,14 +789,19 @@ class TelerWebSocketHandler:
 
         # Extract phone numbers from the start message
         # They can be in the root level or in the data object
-        from_number = data.get("from_number") or data.get("data", {}).get("from_number") or data.get("from")
-        to_number = data.get("to_number") or data.get("data", {}).get("to_number") or data.get("to")
+        payload = data.get("data") or {}
+        from_number = data.get("from_number") or payload.get("from_number") or data.get("from")
+        to_number = data.get("to_number") or payload.get("to_number") or data.get("to")
 
         logger.info(f"🔍 Extracted IDs - call_id: {call_id}, stream_id: {stream_id}, account_id: {account_id}, call_app_id: {call_app_id}")
         logger.info(f"📞 Extracted Numbers - from_number: {from_number}, to_number: {to_number}")
 
+        conn = self.connections.get(connection_id)
+        if conn is None:
+            return
+
         # Store stream metadata
-        self.stream_metadata[connection_id] = {
+        conn.stream_metadata = {
             "account_id": account_id,
             "user_id": user_id,
             "call_app_id": call_app_id,
@@ -296,13 +809,14 @@ class TelerWebSocketHandler:
             "stream_id": stream_id,
             "from_number": from_number,
             "to_number": to_number,
-            "encoding": data.get("data", {}).get("encoding", "audio/l16"),
-            "sample_rate": data.get("data", {}).get("sample_rate", 8000),
-            "channels": data.get("data", {}).get("channels", 1),
+            "encoding": payload.get("encoding", "audio/l16"),
+            "sample_rate": payload.get("sample_rate", 8000),
+            "channels": payload.get("channels", 1),
             "started_at": datetime.now().isoformat()
         }
+        self.active_streams[connection_id] = conn.stream_metadata
 
-        logger.info(f"Stream metadata: {self.stream_metadata[connection_id]}")
+        logger.info("Stream metadata: %s", conn.stream_metadata)
 
         # Look up knowledge base ID from call history using multiple identifiers
         knowledge_base_id = self._get_knowledge_base_for_call(call_id, stream_id, account_id)
@@ -312,10 +826,9 @@ class TelerWebSocketHandler:
             logger.warning(f"⚠️ No knowledge base found for call {call_id}")
 
         # Update call state
-        if connection_id in self.call_states:
-            self.call_states[connection_id]['status'] = 'active'
-            self.call_states[connection_id]['knowledge_base_id'] = knowledge_base_id
-            logger.info(f"📋 Call state updated - KB ID: {knowledge_base_id}")
+        conn.status = 'active'
+        conn.knowledge_base_id = knowledge_base_id
+        logger.info(f"📋 Call state updated - KB ID: {knowledge_base_id}")
         
         # Send initial greeting after a short delay
         await asyncio.sleep(1)  # Give time for connection to stabilize
@@ -324,12 +837,11 @@ class TelerWebSocketHandler:
         # Start silence monitoring
         await self._start_silence_monitoring(connection_id)
     
-    async def _handle_audio_message(self, data: Dict[str, Any], connection_id: str, websocket: WebSocket):
+    async def _handle_audio_message(self, data: Dict[str, Any], conn: Optional[Connection], connection_id: str):
         """Handle incoming audio chunk from Teler - BUFFER APPROACH"""
         # Check if call has ended - CRITICAL CHECK
-        call_state = self.call_states.get(connection_id, {})
-        if call_state.get('call_ended', False):
-            logger.debug(f"🚫 Ignoring audio for ended call: {connection_id}")
+        if conn is None or conn.call_ended:
+            logger.debug("🚫 Ignoring audio for ended call: %s", connection_id)
             return
 
         stream_id = data.get("stream_id")
@@ -340,191 +852,231 @@ class TelerWebSocketHandler:
             logger.warning("Received audio message without audio data")
             return
 
-        # Decode to check size
-        audio_data = base64.b64decode(audio_b64)
-        duration_ms = (len(audio_data) / 2) / 8  # 16-bit samples at 8kHz
+        logger.debug("🎤 Buffering audio chunk %s for stream %s", message_id, stream_id)
 
-        logger.debug(f"🎤 Buffering audio chunk {message_id} for stream {stream_id} ({len(audio_data)} bytes, ~{duration_ms:.1f}ms)")
+        # Decode once; the buffer keeps raw PCM from here on
+        await self._buffer_audio(base64.b64decode(audio_b64), conn, connection_id)
+
+    async def _buffer_audio(self, audio_data: bytes, conn: Connection, connection_id: str):
+        """Append a PCM chunk to the connection's buffer and process it once an utterance is complete"""
+        duration_ms = len(audio_data) // PCM_BYTES_PER_MS  # 16-bit samples at 8kHz
+        logger.debug("🎤 Buffered %d bytes (~%dms) for %s", len(audio_data), duration_ms, connection_id)
 
         # Add to audio buffer instead of processing immediately
-        if connection_id in self.audio_buffers:
-            self.audio_buffers[connection_id].append({
-                'audio_b64': audio_b64,
-                'message_id': message_id,
-                'timestamp': datetime.now(),
-                'duration_ms': duration_ms
-            })
+        conn.append_pcm(audio_data)
+        conn.accumulated_ms += duration_ms
+
+        # Run the VAD frame by frame as audio arrives to spot the end of an utterance
+        detector = conn.utterance_detector
+        utterance_ended = detector.process(audio_data)
 
         # Only process if we're waiting for user input and not already processing
-        if (call_state.get('waiting_for_user', True) and
-            not call_state.get('is_processing', False)):
+        if conn.waiting_for_user and not conn.is_processing:
 
             # Check accumulated duration
-            accumulated_duration = sum(chunk.get('duration_ms', 0) for chunk in self.audio_buffers[connection_id])
-
-            # Wait until we have at least 3 seconds of audio before processing
-            if accumulated_duration >= 3000:  # 3 second minimum
+            accumulated_duration = conn.accumulated_ms
+
+            if utterance_ended:
+                logger.info(f"✅ End of utterance after {accumulated_duration:.0f}ms of audio, processing now...")
+                await self._process_accumulated_audio(conn, connection_id)
+            elif detector.in_speech:
+                # Still talking; only cut in if the utterance runs very long
+                if accumulated_duration >= MAX_UTTERANCE_MS:
+                    logger.info(f"✅ Utterance reached {accumulated_duration:.0f}ms of audio, processing now...")
+                    await self._process_accumulated_audio(conn, connection_id)
+            elif accumulated_duration >= IDLE_AUDIO_FLUSH_MS:
+                # No speech started; hand the buffer over (it is dropped as silence there)
                 logger.info(f"✅ Accumulated {accumulated_duration:.0f}ms of audio, processing now...")
-                await self._process_accumulated_audio(connection_id, websocket)
+                await self._process_accumulated_audio(conn, connection_id)
     
-    async def _process_accumulated_audio(self, connection_id: str, websocket: WebSocket):
+    async def _process_accumulated_audio(self, conn: Connection, connection_id: str):
         """Process accumulated audio chunks"""
-        # Use lock to prevent concurrent processing
-        async with self.processing_locks.get(connection_id, asyncio.Lock()):
-            call_state = self.call_states.get(connection_id, {})
+        # Double check call hasn't ended
+        if conn.call_ended:
+            logger.debug("🚫 Call ended during processing: %s", connection_id)
+            return
             
-            # Double check call hasn't ended
-            if call_state.get('call_ended', False):
-                logger.debug(f"🚫 Call ended during processing: {connection_id}")
-                return
-                
-            # Check if already processing
-            if call_state.get('is_processing', False):
-                logger.debug(f"⏳ Already processing audio for: {connection_id}")
+        # Single-flight guard: check-and-set with no await in between, so
+        # no lock is needed on the event loop
+        if conn.is_processing:
+            logger.debug("⏳ Already processing audio for: %s", connection_id)
+            return
+        
+        # Mark as processing
+        conn.is_processing = True
+        
+        try:
+            # Get accumulated audio chunks
+            if not conn.pcm_len:
                 return
             
-            # Mark as processing
-            if connection_id in self.call_states:
-                self.call_states[connection_id]['is_processing'] = True
+            total_duration_ms = conn.accumulated_ms
+            logger.info("🔄 Processing %d accumulated audio chunks for %s (total: %.0fms)",
+                        conn.pcm_chunks, connection_id, total_duration_ms)
+
+            # Take the buffered audio (zero-copy view) and clear the buffer
+            combined_audio = conn.take_pcm()
             
-            try:
-                # Get accumulated audio chunks
-                audio_chunks = self.audio_buffers.get(connection_id, [])
-                if not audio_chunks:
+            # Level check, VAD and speech filtering are CPU-bound; run them off
+            # the event loop so other calls' audio keeps flowing meanwhile
+            combined_audio = await asyncio.to_thread(self._extract_speech_audio, combined_audio, connection_id)
+            if combined_audio is None:
+                return
+            
+            # Get current language for this connection
+            current_language = conn.current_language
+
+            # Process the combined audio with language detection
+            stt_result = await self._convert_audio_to_text(combined_audio, connection_id, current_language)
+
+            if stt_result and stt_result.get('transcript') and self._is_meaningful_speech(stt_result['transcript']):
+                transcript = stt_result['transcript']
+                transcript_lower = transcript.lower().strip()  # Normalized once for the phrase checks below
+                detected_language = stt_result.get('language', current_language)
+                logger.info(f"📝 USER SAID: '{transcript}' (Language: {detected_language}, Connection: {connection_id})")
+
+                # Check for language switch request
+                switch_language = sarvam_service.detect_language_switch_request(transcript_lower)
+                if switch_language:
+                    logger.info(f"🌐 Language switch requested: {current_language} -> {switch_language}")
+                    conn.current_language = switch_language
+                    await self._send_language_switch_confirmation(connection_id, switch_language)
                     return
-                
-                # Calculate total duration
-                total_duration_ms = sum(chunk.get('duration_ms', 0) for chunk in audio_chunks)
-                logger.info(f"🔄 Processing {len(audio_chunks)} accumulated audio chunks for {connection_id} (total: {total_duration_ms:.0f}ms)")
 
-                # Combine audio chunks
-                combined_audio = self._combine_audio_chunks(audio_chunks)
-                
-                # Clear the buffer
-                self.audio_buffers[connection_id] = []
-                
-                # 🎯 SPEECH DETECTION: Check if combined audio contains speech using WebRTC VAD
-                logger.info(f"🔍 Checking for speech in combined audio using WebRTC VAD...")
-                has_speech = vad_processor.has_speech(combined_audio)
-                
-                if not has_speech:
-                    logger.info(f"🔇 No speech detected in audio chunk, skipping STT processing for {connection_id}")
-                    
-                    # Get VAD statistics for debugging
-                    vad_stats = vad_processor.get_vad_stats(combined_audio)
-                    logger.debug(f"📊 VAD Stats: {vad_stats}")
-                    
-                    return  # Skip STT processing for non-speech audio
-                
-                logger.info(f"🗣️ Speech detected! Proceeding with STT processing for {connection_id}")
-                
-                # Optional: Filter audio to keep only speech segments
-                filtered_audio = vad_processor.filter_speech_audio(combined_audio)
-                if filtered_audio:
-                    logger.info(f"🎯 Using filtered speech-only audio for STT")
-                    combined_audio = filtered_audio
-                else:
-                    logger.info(f"⚠️ Speech filtering returned empty, using original audio")
+                # Update call state - user has spoken meaningfully
+                conn.last_user_speech = time.monotonic()
+                conn.last_meaningful_speech = transcript
+                conn.waiting_for_user = False
+                conn.silence_warnings = 0
+
+                # No silence monitoring while we are responding; it is
+                # re-armed once we are waiting for the user again
+                self._stop_silence_monitoring(connection_id)
                 
-                # Get current language for this connection
-                current_language = self.call_states.get(connection_id, {}).get('current_language', 'en-IN')
-
-                # Process the combined audio with language detection
-                stt_result = await self._convert_audio_to_text(combined_audio, connection_id, current_language)
-
-                if stt_result and stt_result.get('transcript') and self._is_meaningful_speech(stt_result['transcript']):
-                    transcript = stt_result['transcript']
-                    detected_language = stt_result.get('language', current_language)
-                    logger.info(f"📝 USER SAID: '{transcript}' (Language: {detected_language}, Connection: {connection_id})")
-
-                    # Check for language switch request
-                    switch_language = sarvam_service.detect_language_switch_request(transcript)
-                    if switch_language:
-                        logger.info(f"🌐 Language switch requested: {current_language} -> {switch_language}")
-                        if connection_id in self.call_states:
-                            self.call_states[connection_id]['current_language'] = switch_language
-                        await self._send_language_switch_confirmation(connection_id, websocket, switch_language)
-                        return
+                # Add to conversation history
+                conn.conversation.append({
+                    "role": "user",
+                    "content": transcript
+                })
 
+                # Start the reply in the current language while the transcript's language is
+                # detected, so the two round trips overlap. Only an actual language change
+                # discards it and generates again in the new language.
+                end_call = self._matches_end_call_phrase(transcript_lower)
+                response_task = None
+                if not end_call:
+                    response_task = asyncio.create_task(self._generate_ai_response(transcript, connection_id))
+
+                try:
                     # Detect language from transcript for auto-switching
                     detected_text_language = await sarvam_service.detect_language_from_text(transcript)
                     if detected_text_language and detected_text_language != current_language:
                         logger.info(f"🌐 Auto language switch detected: {current_language} -> {detected_text_language}")
-                        if connection_id in self.call_states:
-                            self.call_states[connection_id]['current_language'] = detected_text_language
-                            self.call_states[connection_id]['detected_language'] = detected_text_language
-
-                    # Update call state - user has spoken meaningfully
-                    if connection_id in self.call_states:
-                        self.call_states[connection_id]['last_user_speech'] = datetime.now()
-                        self.call_states[connection_id]['last_meaningful_speech'] = transcript
-                        self.call_states[connection_id]['waiting_for_user'] = False
-                        self.call_states[connection_id]['silence_warnings'] = 0
-                    
-                    # Add to conversation history
-                    if connection_id not in self.conversation_history:
-                        self.conversation_history[connection_id] = []
-                    
-                    self.conversation_history[connection_id].append({
-                        "role": "user",
-                        "content": transcript
-                    })
-                    
+                        conn.current_language = detected_text_language
+                        conn.detected_language = detected_text_language
+                        if response_task is not None:
+                            response_task.cancel()
+                            response_task = asyncio.create_task(self._generate_ai_response(transcript, connection_id))
+
                     # Generate and send AI response
-                    await self._generate_and_send_ai_response(transcript, connection_id, websocket)
-                    
-                    # Reset silence monitoring
-                    await self._reset_silence_monitoring(connection_id)
-                else:
-                    logger.debug(f"🔇 Speech detected but no meaningful transcript generated for {connection_id}")
-                    
-            except Exception as e:
-                logger.error(f"❌ Error processing accumulated audio: {e}")
-            finally:
-                # Mark as not processing
-                if connection_id in self.call_states:
-                    self.call_states[connection_id]['is_processing'] = False
-    
-    def _combine_audio_chunks(self, audio_chunks: list) -> str:
-        """Combine multiple audio chunks into one"""
-        try:
-            combined_data = b''
-            for chunk in audio_chunks:
-                audio_data = base64.b64decode(chunk['audio_b64'])
-                combined_data += audio_data
+                    await self._generate_and_send_ai_response(transcript, connection_id, end_call, response_task)
+                finally:
+                    # Don't leave a reply generating if we were cancelled (no-op once it is done)
+                    if response_task is not None:
+                        response_task.cancel()
+                
+                # Waiting for the user again - restart silence monitoring
+                await self._reset_silence_monitoring(connection_id)
+            else:
+                logger.debug(f"🔇 Speech detected but no meaningful transcript generated for {connection_id}")
+                
+        except Exception as e:
+            logger.error(f"❌ Error processing accumulated audio: {e}")
+        finally:
+            # Mark as not processing
+            conn.is_processing = False
+
+    def _extract_speech_audio(self, combined_audio: Union[bytes, memoryview], connection_id: str) -> Optional[Union[bytes, memoryview]]:
+        """
+        Screen buffered audio for speech (runs in a worker thread).
+
+        Returns:
+            Speech-only audio for STT, the original audio if filtering found
+            nothing to cut, or None if the audio is silent / has no speech
+        """
+        rms, peak = self._analyze_audio(combined_audio)
+        
+        # Cheap energy precheck: most buffers are silence between
+        # utterances, so skip the VAD and STT entirely for them
+        if peak is not None and (peak < SILENCE_PEAK_THRESHOLD or rms < SILENCE_RMS_THRESHOLD):
+            logger.info(f"🔇 Silent audio (RMS={rms:.2f}, Peak={peak}), skipping VAD and STT for {connection_id}")
+            return None
+        
+        # 🎯 SPEECH DETECTION: Check if combined audio contains speech using WebRTC VAD
+        logger.debug("🔍 Checking for speech in combined audio using WebRTC VAD...")
+        has_speech = vad_processor.has_speech_pcm(combined_audio)
+        
+        if not has_speech:
+            logger.info(f"🔇 No speech detected in audio chunk, skipping STT processing for {connection_id}")
+            
+            # VAD statistics are a second full VAD pass; only run it when debugging
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("📊 VAD Stats: %s", vad_processor.get_vad_stats_pcm(combined_audio))
+            
+            return None  # Skip STT processing for non-speech audio
+        
+        logger.info(f"🗣️ Speech detected! Proceeding with STT processing for {connection_id}")
+        
+        # Optional: Filter audio to keep only speech segments
+        filtered_audio = vad_processor.filter_speech_pcm(combined_audio)
+        if filtered_audio:
+            logger.info(f"🎯 Using filtered speech-only audio for STT")
+            return filtered_audio
+        
+        logger.info(f"⚠️ Speech filtering returned empty, using original audio")
+        return combined_audio
 
-            # Calculate audio characteristics for debugging
-            duration_ms = (len(combined_data) / 2) / 8  # 16-bit samples at 8kHz
+    def _analyze_audio(self, audio_pcm: Union[bytes, memoryview]) -> Tuple[Optional[float], Optional[int]]:
+        """
+        Compute signal levels of raw PCM audio.
 
-            # Calculate RMS and peak for audio analysis
-            import struct
-            samples = struct.unpack(f'<{len(combined_data)//2}h', combined_data)
-            rms = (sum(s*s for s in samples) / len(samples)) ** 0.5 if samples else 0
-            peak = max(abs(s) for s in samples) if samples else 0
+        Returns:
+            Tuple of (RMS, peak); both are None if the audio could not be analyzed
+        """
+        try:
+            # Vectorized levels: peak from int16 min/max (negated as a Python int so
+            # -32768 cannot overflow), energy as one int64 dot product with no squared temporary
+            samples = np.frombuffer(audio_pcm, dtype='<i2', count=len(audio_pcm) // 2)
+            if samples.size:
+                peak = max(int(samples.max()), -int(samples.min()))
+                wide = samples.astype(np.int64)
+                rms = float(np.sqrt(np.dot(wide, wide) / wide.size))
+            else:
+                rms = 0.0
+                peak = 0
 
-            logger.info(f"🔍 Analyzing combined audio characteristics...")
-            logger.info(f"📊 Audio Info: RMS={rms:.2f}, Peak={peak}, Duration={duration_ms:.1f}ms")
+            if logger.isEnabledFor(logging.INFO):
+                logger.info("📊 Audio Info: RMS=%.2f, Peak=%d, Duration=%.1fms",
+                            rms, peak, len(audio_pcm) / PCM_BYTES_PER_MS)
 
-            # Encode back to base64
-            return base64.b64encode(combined_data).decode('utf-8')
+            return rms, peak
         except Exception as e:
-            logger.error(f"Error combining audio chunks: {e}")
-            # Return the first chunk if combination fails
-            return audio_chunks[0]['audio_b64'] if audio_chunks else ""
+            logger.error(f"Error analyzing audio: {e}")
+            return None, None
     
-    async def _convert_audio_to_text(self, audio_b64: str, connection_id: str, language: str = "en-IN") -> Optional[Dict[str, Any]]:
-        """Convert audio to text using Sarvam AI"""
+    async def _convert_audio_to_text(self, audio_pcm: bytes, connection_id: str, language: str = "en-IN") -> Optional[Dict[str, Any]]:
+        """Convert raw PCM audio to text using Sarvam AI"""
         try:
             logger.info(f"🎯 Converting speech audio to text for connection: {connection_id} (language: {language})")
-            logger.debug(f"Audio data length: {len(audio_b64)} base64 characters")
-
-            # Get VAD statistics for logging
-            vad_stats = vad_processor.get_vad_stats(audio_b64)
-            logger.info(f"📊 Final VAD Stats before STT: speech_ratio={vad_stats.get('speech_ratio', 0):.2f}, speech_duration={vad_stats.get('speech_duration_ms', 0)}ms")
+            # VAD statistics (an extra VAD pass over the audio) are for debugging only
+            if logger.isEnabledFor(logging.DEBUG):
+                vad_stats = await asyncio.to_thread(vad_processor.get_vad_stats_pcm, audio_pcm)
+                logger.debug("📊 Final VAD Stats before STT: %d bytes, speech_ratio=%.2f, speech_duration=%sms",
+                             len(audio_pcm), vad_stats.get('speech_ratio', 0), vad_stats.get('speech_duration_ms', 0))
 
             # Convert speech to text using Sarvam AI with specified language
             logger.info(f"🎯 Converting speech-validated audio to text with Sarvam AI (language: {language})...")
-            stt_result = await sarvam_service.speech_to_text(audio_b64, language=language)
+            stt_result = await sarvam_service.speech_to_text_pcm(audio_pcm, language=language)
 
             if stt_result and stt_result.get('transcript') and stt_result['transcript'].strip():
                 logger.info(f"📝 STT Result: '{stt_result['transcript']}' (Language: {stt_result.get('language')}, Connection: {connection_id})")
@@ -540,14 +1092,27 @@ class TelerWebSocketHandler:
             logger.error(f"❌ Error converting audio to text: {e}")
             return None
     
-    async def _generate_and_send_ai_response(self, user_input: str, connection_id: str, websocket: WebSocket):
-        """Generate AI response and send it back"""
+    async def _generate_and_send_ai_response(self, user_input: str, connection_id: str, end_call: bool,
+                                             response_task: Optional[asyncio.Task] = None):
+        """
+        Generate AI response and send it back
+
+        Args:
+            user_input: User's transcript
+            connection_id: Connection identifier
+            end_call: Whether the transcript asks to end the call (checked once by the caller)
+            response_task: Reply already being generated by the caller; generated here if not given
+        """
+        conn = self.connections.get(connection_id)
+        if conn is None:
+            return
+
         try:
             # Get current language for this connection
-            current_language = self.call_states.get(connection_id, {}).get('current_language', 'en-IN')
+            current_language = conn.current_language
 
             # Check if user wants to end the call
-            if self._is_end_call_request(user_input):
+            if end_call:
                 logger.info(f"🛑 User requested to end call: {connection_id} (language: {current_language})")
                 logger.info(f"📞 Initiating call termination sequence...")
                 await self._end_call_with_goodbye(connection_id, current_language)
@@ -556,7 +1121,15 @@ class TelerWebSocketHandler:
 
             # Generate AI response using Claude
             logger.info(f"🤖 Generating AI response with Claude (language: {current_language})...")
-            ai_response = await self._generate_ai_response(user_input, connection_id)
+            if response_task is not None:
+                ai_response = await response_task
+            else:
+                ai_response = await self._generate_ai_response(user_input, connection_id)
+
+            # The call may have ended while the reply was generating; don't speak into it
+            if conn.call_ended:
+                logger.debug("🚫 Call ended during AI response generation: %s", connection_id)
+                return
 
             if not ai_response:
                 # Default fallback based on language
@@ -568,7 +1141,7 @@ class TelerWebSocketHandler:
             logger.info(f"💬 AI Response: '{ai_response}' (Language: {current_language})")
 
             # Add AI response to conversation history
-            self.conversation_history[connection_id].append({
+            conn.conversation.append({
                 "role": "assistant",
                 "content": ai_response
             })
@@ -578,20 +1151,15 @@ class TelerWebSocketHandler:
 
             # Convert AI response to speech using Sarvam AI with current language
             logger.info(f"🔊 Converting AI response to speech with Sarvam AI (language: {current_language}, speaker: {speaker})...")
-            response_audio = await sarvam_service.text_to_speech(
-                text=ai_response,
-                language=current_language,
-                speaker=speaker
-            )
+            sentences = [part for part in _SENTENCE_SPLIT_RE.split(ai_response.strip()) if part]
+            sent = await self._speak_sentences(conn, sentences or [ai_response], current_language, speaker)
             
-            if response_audio:
-                await self._send_audio_response(websocket, response_audio)
+            if sent:
                 logger.info("✅ AI response sent successfully")
                 
                 # Update call state - now waiting for user again
-                if connection_id in self.call_states:
-                    self.call_states[connection_id]['waiting_for_user'] = True
-                    self.call_states[connection_id]['last_ai_response'] = datetime.now()
+                conn.waiting_for_user = True
+                conn.last_ai_response = time.monotonic()
             else:
                 logger.error("❌ Failed to generate response audio")
                 
@@ -640,25 +1208,22 @@ class TelerWebSocketHandler:
     
     async def _send_initial_greeting(self, connection_id: str, start_data: Dict[str, Any] = {}):
         """Send initial greeting audio to the caller"""
-        websocket = self.active_connections.get(connection_id)
-        call_state = self.call_states.get(connection_id, {})
+        conn = self.connections.get(connection_id)
 
-        if not websocket or call_state.get('greeting_sent', False) or call_state.get('call_ended', False):
+        if conn is None or conn.greeting_sent or conn.call_ended:
             return
 
         # Mark greeting as sent
-        if connection_id in self.call_states:
-            self.call_states[connection_id]['greeting_sent'] = True
-            self.call_states[connection_id]['waiting_for_user'] = True
+        conn.greeting_sent = True
+        conn.waiting_for_user = True
 
         # Get current language
-        current_language = self.call_states.get(connection_id, {}).get('current_language', 'en-IN')
+        current_language = conn.current_language
 
         # Greeting text based on language
         # --- DYNAMIC GREETING MESSAGE LOGIC ---
         # 1. Define the hard-coded default greeting as a fallback.
-        default_greeting = "Hello! Welcome to the AdrshyamAI Help Center. How can I assist you today?"
-        greeting_text = default_greeting
+        greeting_text = DEFAULT_GREETING
 
         # 2. Get user_id from the start message to fetch the personalized prompt.
         # The frontend should pass this in the 'data' object of the 'start' message.
@@ -690,86 +1255,114 @@ class TelerWebSocketHandler:
         # Get appropriate speaker
         speaker = self._get_speaker_for_language(current_language)
 
-        # Generate greeting audio using Sarvam AI TTS
-        greeting_audio = await sarvam_service.text_to_speech(
-            text=greeting_text,
-            language=current_language,
-            speaker=speaker
-        )
+        # Generate greeting audio using Sarvam AI TTS (cached; the text rarely changes)
+        greeting_frame = await self._get_cached_audio_frame(greeting_text, current_language, speaker)
         
-        if greeting_audio:
-            greeting_message = {
-                "type": "audio",
-                "audio_b64": greeting_audio,
-                "chunk_id": self.chunk_counter
-            }
-            
-            self.chunk_counter += 1
-            
-            try:
-                await websocket.send_text(json.dumps(greeting_message))
-                logger.info(f"✅ Sent greeting to connection {connection_id}")
-                
-                # Update call state
-                if connection_id in self.call_states:
-                    self.call_states[connection_id]['last_ai_response'] = datetime.now()
-                    
-            except Exception as e:
-                logger.error(f"Failed to send greeting: {e}")
+        if greeting_frame:
+            conn.send(_complete_audio_frame(greeting_frame, next(conn.chunk_ids)))
+            logger.info(f"✅ Sent greeting to connection {connection_id}")
+
+            # Update call state
+            conn.last_ai_response = time.monotonic()
         else:
             logger.warning("Failed to generate greeting audio with Sarvam AI")
     
-    def _convert_audio_format(self, audio_b64: str) -> str:
-        """Convert Teler audio format to format suitable for Sarvam AI"""
-        try:
-            # Decode base64 audio
-            audio_data = base64.b64decode(audio_b64)
-            
-            # Create WAV format for Sarvam AI
-            wav_buffer = io.BytesIO()
-            
-            with wave.open(wav_buffer, 'wb') as wav_file:
-                wav_file.setnchannels(1)  # Mono
-                wav_file.setsampwidth(2)  # 16-bit
-                wav_file.setframerate(8000)  # 8kHz sample rate
-                wav_file.writeframes(audio_data)
-            
-            # Get WAV data and encode to base64
-            wav_data = wav_buffer.getvalue()
-            wav_b64 = base64.b64encode(wav_data).decode('utf-8')
-            
-            logger.debug(f"Converted audio: PCM {len(audio_data)} bytes -> WAV {len(wav_data)} bytes")
-            return wav_b64
-            
-        except Exception as e:
-            logger.error(f"Error converting audio format: {e}")
-            return audio_b64  # Return original if conversion fails
-    
+    async def _get_cached_audio_frame(self, text: str, language: str, speaker: str) -> Optional[str]:
+        """
+        Get the audio frame for a fixed phrase or greeting from its cache, synthesizing it on first use.
+        Frames are stored pre-serialized up to the chunk_id; finish them with _complete_audio_frame().
+
+        Args:
+            text: Phrase to speak
+            language: TTS language code
+            speaker: TTS speaker voice
+
+        Returns:
+            Audio frame prefix or None if TTS failed
+        """
+        key = (text, language, speaker)
+        cache = self.tts_cache if text in _FIXED_PHRASES else self.greeting_tts_cache
+        frame_prefix = cache.get(key)
+        if frame_prefix is not None:
+            return frame_prefix
+
+        # Calls hitting the same uncached phrase at once share one TTS request;
+        # shielded so a caller being cancelled doesn't cancel it for the others
+        pending = self.tts_pending.get(key)
+        if pending is None:
+            pending = asyncio.ensure_future(self._synthesize_frame_prefix(key))
+            self.tts_pending[key] = pending
+            pending.add_done_callback(lambda _, key=key: self.tts_pending.pop(key, None))
+        return await asyncio.shield(pending)
+
+    async def _synthesize_frame_prefix(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """Run TTS for a (text, language, speaker) key and cache the resulting frame prefix"""
+        text, language, speaker = key
+        audio = await sarvam_service.text_to_speech(text=text, language=language, speaker=speaker)
+        if not audio:
+            return None
+        frame_prefix = _audio_frame_prefix(audio)
+        if text in _FIXED_PHRASES:
+            self.tts_cache[key] = frame_prefix
+        else:
+            # Custom greetings are open-ended; cap them so they can't crowd out memory
+            cache = self.greeting_tts_cache
+            if len(cache) >= GREETING_TTS_CACHE_SIZE:
+                cache.pop(next(iter(cache)))  # Evict the oldest entry
+            cache[key] = frame_prefix
+        return frame_prefix
+
+    def start_tts_warmup(self):
+        """Run warm_tts_cache() in the background, keeping the task so it can be cancelled on shutdown"""
+        if self.tts_warmup is None or self.tts_warmup.done():
+            self.tts_warmup = asyncio.create_task(self.warm_tts_cache())
+            self.tts_warmup.add_done_callback(self._log_tts_warmup_failure)
+
+    @staticmethod
+    def _log_tts_warmup_failure(task: asyncio.Task):
+        """Report a warm-up that died, which would otherwise go unnoticed"""
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("TTS cache warm-up failed", exc_info=task.exception())
+
+    async def warm_tts_cache(self):
+        """Synthesize the default greeting and all fixed call phrases ahead of the first call"""
+        # Every call starts in en-IN; greetings are sent before any language switch
+        phrases = [(DEFAULT_GREETING, 'en-IN')]
+        for messages in _FIXED_PHRASE_TABLES:
+            phrases.extend((text, language) for language, text in messages.items())
+
+        cached = 0
+        for text, language in phrases:
+            try:
+                if await self._get_cached_audio_frame(text, language, self._get_speaker_for_language(language)):
+                    cached += 1
+            except Exception as e:
+                logger.error(f"Error pre-generating TTS for {language}: {e}")
+        logger.info(f"✅ Pre-generated {cached}/{len(phrases)} fixed TTS phrases")
+
     def _is_meaningful_speech(self, transcript: str) -> bool:
         """Check if the transcript contains meaningful speech"""
-        if not transcript or not transcript.strip():
-            return False
-            
-        # Remove common filler words and check length
-        cleaned = transcript.strip().lower()
-        
-        # Ignore very short utterances or common fillers
-        filler_words = ['so', 'um', 'uh', 'hmm', 'ah', 'er', 'well', 'and', 'the', 'but', 'oh']
-        
-        # If it's just a filler word, don't consider it meaningful
-        if cleaned in filler_words:
-            logger.debug(f"Ignoring filler word: '{cleaned}'")
+        if not transcript:
             return False
-            
+
+        stripped = transcript.strip()
+
         # If it's very short (less than 4 characters), likely not meaningful
-        if len(cleaned) < 4:
-            logger.debug(f"Ignoring short utterance: '{cleaned}'")
+        if len(stripped) < 4:
+            logger.debug("Ignoring short utterance: '%s'", stripped)
+            return False
+
+        cleaned = stripped.lower()
+
+        # If it's just a filler word, don't consider it meaningful
+        if cleaned in FILLER_WORDS:
+            logger.debug("Ignoring filler word: '%s'", cleaned)
             return False
             
         # If it's the same word repeated, might be noise
         words = cleaned.split()
         if len(words) == 1 and len(words[0]) < 5:
-            logger.debug(f"Ignoring single short word: '{cleaned}'")
+            logger.debug("Ignoring single short word: '%s'", cleaned)
             return False
         
         # Check if it's a meaningful sentence (has at least 2 words or one long word)
@@ -780,35 +1373,24 @@ class TelerWebSocketHandler:
     
     async def _generate_ai_response(self, user_input: str, connection_id: str) -> Optional[str]:
         """Generate AI response using Ollama based on user input and conversation history."""
-        try:
-            # Get current language
-            current_language = self.call_states.get(connection_id, {}).get('current_language', 'en-IN')
+        conn = self.connections.get(connection_id)
+        if conn is None or conn.call_ended:
+            logger.debug("🚫 Skipping AI response for ended call: %s", connection_id)
+            return None
+
+        current_language = conn.current_language
 
+        try:
             if not ollama_service.is_available():
                 # Fallback responses based on language
-                if current_language == 'en-IN':
-                    fallback_responses = [
-                        "Thank you. What else would you like to know?",
-                        "I understand. Please continue.",
-                        "That's interesting. What else?",
-                        "Okay. What else would you like to say?"
-                    ]
-                else:
-                    fallback_responses = [
-                        "धन्यवाद। आप और क्या जानना चाहते हैं?",
-                        "मैं समझ गया। कृपया आगे बताएं।",
-                        "यह दिलचस्प है। और क्या है?",
-                        "अच्छा। आप और क्या कहना चाहते हैं?"
-                    ]
-                import random
-                return random.choice(fallback_responses)
+                return random.choice(FALLBACK_RESPONSES_EN if current_language == 'en-IN' else FALLBACK_RESPONSES_HI)
 
             # Get knowledge base ID for this call
-            knowledge_base_id = self.call_states.get(connection_id, {}).get('knowledge_base_id')
+            knowledge_base_id = conn.knowledge_base_id
             logger.info(f"Using knowledge base ID: {knowledge_base_id} for AI response")
 
             conversation_context = {
-                'history': self.conversation_history.get(connection_id, []),
+                'history': conn.conversation,
                 'current_input': user_input,
                 'call_id': connection_id,
                 'knowledge_base_id': knowledge_base_id,
@@ -826,73 +1408,149 @@ class TelerWebSocketHandler:
         except Exception as e:
             logger.error(f"Error generating AI response: {str(e)}")
             # Return fallback based on current language
-            current_language = self.conversation_history.get(connection_id, [{}])[-1].get('language', 'en-IN') if connection_id in self.conversation_history else 'hi-IN'
             if current_language == 'en-IN':
                 return "I'm glad you spoke."
             return "मुझे खुशी है कि आपने बात की।"  # "I'm glad you spoke."
             
-    async def _send_audio_response(self, websocket: WebSocket, audio_b64: str):
-        """Send audio response back to Teler"""
-        response_message = {
-            "type": "audio",
-            "audio_b64": audio_b64,
-            "chunk_id": self.chunk_counter
-        }
-        
-        self.chunk_counter += 1
-        
+    async def _speak_sentences(self, conn: Connection, sentences: list, language: str, speaker: str) -> bool:
+        """
+        Relay streamed TTS audio to the client chunk by chunk, so playback starts
+        after the first sentence's TTS instead of the whole response's.
+
+        Args:
+            conn: Connection to send the audio on
+            sentences: Response text split into sentences, in playback order
+            language: TTS language code
+            speaker: TTS speaker voice
+
+        Returns:
+            True if at least one audio chunk was sent
+        """
+        audio_stream = sarvam_service.text_to_speech_stream(sentences, language=language, speaker=speaker)
+        sent = False
         try:
-            await websocket.send_text(json.dumps(response_message))
-            logger.debug(f"Sent audio response chunk {self.chunk_counter - 1}")
-        except Exception as e:
-            logger.error(f"Failed to send audio response: {e}")
+            async for audio in audio_stream:
+                if conn.call_ended:
+                    break  # Hung up mid-response; the rest of the TTS is cancelled below
+                self._send_audio_response(conn, audio)
+                sent = True
+        finally:
+            # Cancels any TTS still in flight if sending was cancelled mid-response
+            await audio_stream.aclose()
+        return sent
+
+    def _send_audio_response(self, conn: Connection, audio_b64: str):
+        """Send audio response back to Teler"""
+        chunk_id = next(conn.chunk_ids)
+        conn.send(_audio_frame(audio_b64, chunk_id))
+        logger.debug("Queued audio response chunk %d", chunk_id)
     
+    def _stop_silence_monitoring(self, connection_id: str):
+        """Cancel any pending silence check for the connection"""
+        conn = self.connections.get(connection_id)
+        if conn is not None:
+            conn.cancel_silence_check()
+
     async def _start_silence_monitoring(self, connection_id: str):
         """Start monitoring for silence and handle call timeout"""
-        if connection_id in self.silence_timers:
-            self.silence_timers[connection_id].cancel()
-        
-        self.silence_timers[connection_id] = asyncio.create_task(
-            self._monitor_silence(connection_id)
-        )
+        self._stop_silence_monitoring(connection_id)
+
+        conn = self.connections.get(connection_id)
+        if conn is None or conn.call_ended:
+            return
+
+        self._arm_silence_check(conn, connection_id)
     
     async def _reset_silence_monitoring(self, connection_id: str):
         """Reset silence monitoring timer"""
         await self._start_silence_monitoring(connection_id)
-    
-    async def _monitor_silence(self, connection_id: str):
-        """Monitor for silence and handle timeouts"""
+
+    def _arm_silence_check(self, conn: Connection, connection_id: str):
+        """Schedule the next silence check, waking the ticker only if it would otherwise sleep past it"""
+        deadline = time.monotonic() + SILENCE_TIMEOUT_SECONDS
+        conn.silence_deadline = deadline
+        heapq.heappush(self.silence_heap, (deadline, connection_id))
+        next_wakeup = self.silence_next_wakeup
+        if self.silence_wakeup is not None and (next_wakeup is None or deadline < next_wakeup):
+            self.silence_wakeup.set()
+
+    async def _silence_tick_loop(self):
+        """
+        Pop the silence deadlines that are due off the heap and start their checks,
+        then sleep until the earliest remaining one (or until an earlier one is armed).
+        Each wake-up only touches due entries, however many connections are open.
+        """
+        wakeup = self.silence_wakeup
+        heap = self.silence_heap
+        connections = self.connections  # Same dict for the handler's lifetime; bound once for the drain loop
+        heappop = heapq.heappop
         try:
             while True:
-                await asyncio.sleep(30)  # Check every 30 seconds
-                
-                call_state = self.call_states.get(connection_id, {})
-                if call_state.get('call_ended', False):
-                    break
-                
-                last_speech = call_state.get('last_user_speech')
-                
-                if not last_speech:
-                    continue
-                
+                now = time.monotonic()
+                while heap and heap[0][0] <= now:
+                    deadline, connection_id = heappop(heap)
+                    conn = connections.get(connection_id)
+                    # Skip entries left behind by a cancel, a re-arm or a disconnect
+                    if conn is None or conn.silence_deadline != deadline or conn.silence_check is not None:
+                        continue
+                    # Run as a task so a slow TTS warning cannot stall other connections
+                    conn.silence_deadline = None
+                    conn.silence_check = asyncio.create_task(self._check_silence(conn, connection_id, now))
+
+                next_deadline = heap[0][0] if heap else None
+                self.silence_next_wakeup = next_deadline
+                wakeup.clear()
+                try:
+                    timeout = None if next_deadline is None else max(next_deadline - time.monotonic(), 0)
+                    await asyncio.wait_for(wakeup.wait(), timeout=timeout)
+                except asyncio.TimeoutError:
+                    pass
+        except asyncio.CancelledError:
+            logger.debug("Silence ticker cancelled")
+        except Exception as e:
+            logger.error(f"Error in silence ticker: {e}")
+
+    async def _check_silence(self, conn: Connection, connection_id: str, now: float):
+        """
+        Check for silence, send a warning or end the call, then re-arm the timer.
+
+        Args:
+            conn: Connection being checked
+            connection_id: Connection identifier
+            now: time.monotonic() of the ticker pass that found the deadline due
+        """
+        try:
+            if conn.call_ended or self.connections.get(connection_id) is not conn:
+                return
+
+            last_speech = conn.last_user_speech
+
+            if last_speech is not None:
                 # Calculate time since last meaningful user speech
-                time_since_speech = datetime.now() - last_speech
-                
+                time_since_speech = now - last_speech
+
                 # If no speech for 30 seconds, send warning or end call
-                if time_since_speech.total_seconds() >= 30:
-                    warnings = call_state.get('silence_warnings', 0)
-                    max_warnings = call_state.get('max_silence_warnings', 2)
-                    
+                if time_since_speech >= SILENCE_TIMEOUT_SECONDS:
+                    warnings = conn.silence_warnings
+                    max_warnings = conn.max_silence_warnings
+
                     if warnings < max_warnings:
                         # Send warning
                         await self._send_silence_warning(connection_id, warnings + 1)
-                        if connection_id in self.call_states:
-                            self.call_states[connection_id]['silence_warnings'] = warnings + 1
+                        conn.silence_warnings = warnings + 1
                     else:
                         # End call
                         await self._end_call_gracefully(connection_id)
-                        break
-                        
+                        return
+
+            # Re-arm for the next check unless the call has gone away or
+            # monitoring was reset while the warning was being sent
+            if (self.connections.get(connection_id) is conn and
+                not conn.call_ended and
+                conn.silence_check is asyncio.current_task()):
+                conn.silence_check = None
+                self._arm_silence_check(conn, connection_id)
+
         except asyncio.CancelledError:
             logger.debug(f"Silence monitoring cancelled for {connection_id}")
         except Exception as e:
@@ -908,119 +1566,64 @@ class TelerWebSocketHandler:
         Returns:
             Speaker name for Sarvam AI TTS
         """
-        speaker_map = {
-            'en-IN': 'meera',
-            'hi-IN': 'meera',
-            'bn-IN': 'meera',
-            'gu-IN': 'meera',
-            'kn-IN': 'meera',
-            'ml-IN': 'meera',
-            'mr-IN': 'meera',
-            'or-IN': 'meera',
-            'pa-IN': 'meera',
-            'ta-IN': 'meera',
-            'te-IN': 'meera'
-        }
-        return speaker_map.get(language, 'meera')
+        # Every supported language currently uses the same voice
+        return DEFAULT_SPEAKER
 
-    async def _send_language_switch_confirmation(self, connection_id: str, websocket: WebSocket, new_language: str):
+    async def _send_language_switch_confirmation(self, connection_id: str, new_language: str):
         """
         Send confirmation message when language is switched.
 
         Args:
             connection_id: Connection identifier
-            websocket: WebSocket connection
             new_language: New language code
         """
         try:
-            # Confirmation messages in different languages
-            confirmations = {
-                'en-IN': "I will now speak in English. How can I help you?",
-                'hi-IN': "मैं अब हिंदी में बोलूंगी। मैं आपकी कैसे मदद कर सकती हूं?",
-                'bn-IN': "আমি এখন বাংলায় কথা বলব। আমি আপনাকে কিভাবে সাহায্য করতে পারি?",
-                'gu-IN': "હું હવે ગુજરાતીમાં બોલીશ. હું તમારી કેવી રીતે મદદ કરી શકું?",
-                'kn-IN': "ನಾನು ಈಗ ಕನ್ನಡದಲ್ಲಿ ಮಾತನಾಡುತ್ತೇನೆ. ನಾನು ನಿಮಗೆ ಹೇಗೆ ಸಹಾಯ ಮಾಡಬಹುದು?",
-                'ml-IN': "ഞാൻ ഇപ്പോൾ മലയാളത്തിൽ സംസാരിക്കും. ഞാൻ നിങ്ങളെ എങ്ങനെ സഹായിക്കും?",
-                'mr-IN': "मी आता मराठीत बोलेन. मी तुम्हाला कशी मदत करू शकते?",
-                'or-IN': "ମୁଁ ବର୍ତ୍ତମାନ ଓଡ଼ିଆରେ କହିବି। ମୁଁ ଆପଣଙ୍କୁ କିପରି ସାହାଯ୍ୟ କରିପାରିବି?",
-                'pa-IN': "ਮੈਂ ਹੁਣ ਪੰਜਾਬੀ ਵਿੱਚ ਬੋਲਾਂਗੀ। ਮੈਂ ਤੁਹਾਡੀ ਕਿਵੇਂ ਮਦਦ ਕਰ ਸਕਦੀ ਹਾਂ?",
-                'ta-IN': "நான் இப்போது தமிழில் பேசுவேன். நான் உங்களுக்கு எப்படி உதவ முடியும்?",
-                'te-IN': "నేను ఇప్పుడు తెలుగులో మాట్లాడతాను. నేను మీకు ఎలా సహాయం చేయగలను?"
-            }
 
-            confirmation_text = confirmations.get(new_language, confirmations['en-IN'])
+            confirmation_text = LANGUAGE_SWITCH_CONFIRMATIONS.get(new_language, LANGUAGE_SWITCH_CONFIRMATIONS['en-IN'])
 
             logger.info(f"🌐 Sending language switch confirmation: {new_language}")
 
-            # Get appropriate speaker
+            # Get appropriate speaker and resolve the connection before waiting on TTS
             speaker = self._get_speaker_for_language(new_language)
+            conn = self.connections.get(connection_id)
+            if conn is None:
+                return
 
-            # Generate confirmation audio
-            confirmation_audio = await sarvam_service.text_to_speech(
-                text=confirmation_text,
-                language=new_language,
-                speaker=speaker
-            )
-
-            if confirmation_audio:
-                confirmation_message = {
-                    "type": "audio",
-                    "audio_b64": confirmation_audio,
-                    "chunk_id": self.chunk_counter
-                }
-
-                self.chunk_counter += 1
+            # Generate confirmation audio (a cache hit for every supported language once warmed)
+            confirmation_frame = await self._get_cached_audio_frame(confirmation_text, new_language, speaker)
 
-                await websocket.send_text(json.dumps(confirmation_message))
+            if confirmation_frame:
+                conn.send(_complete_audio_frame(confirmation_frame, next(conn.chunk_ids)))
                 logger.info(f"✅ Sent language switch confirmation to {connection_id}")
 
                 # Update call state
-                if connection_id in self.call_states:
-                    self.call_states[connection_id]['last_ai_response'] = datetime.now()
-                    self.call_states[connection_id]['waiting_for_user'] = True
+                conn.last_ai_response = time.monotonic()
+                conn.waiting_for_user = True
 
         except Exception as e:
             logger.error(f"Failed to send language switch confirmation: {e}")
 
     async def _send_silence_warning(self, connection_id: str, warning_number: int):
-        """Send a silence warning to the user"""
-        websocket = self.active_connections.get(connection_id)
-        if not websocket:
+        """Send a silence warning to the user (at most one TTS request in flight per connection)"""
+        conn = self.connections.get(connection_id)
+        if conn is None:
             return
 
-        # Get current language
-        current_language = self.call_states.get(connection_id, {}).get('current_language', 'en-IN')
+        # Check-and-set with no await in between, so the flag alone is race-free on the event loop
+        if conn.warning_in_flight:
+            logger.debug(f"⏳ Silence warning already in flight for: {connection_id}")
+            return
+        conn.warning_in_flight = True
 
-        # Multi-language silence warnings
-        if warning_number == 1:
-            warning_texts = {
-                'en-IN': "Are you there? Please speak.",
-                'hi-IN': "क्या आप वहाँ हैं? कृपया बोलें।",
-                'bn-IN': "আপনি কি সেখানে আছেন? অনুগ্রহ করে কথা বলুন।",
-                'gu-IN': "શું તમે ત્યાં છો? કૃપા કરીને બોલો.",
-                'kn-IN': "ನೀವು ಅಲ್ಲಿದ್ದೀರಾ? ದಯವಿಟ್ಟು ಮಾತನಾಡಿ.",
-                'ml-IN': "നിങ്ങൾ അവിടെ ഉണ്ടോ? ദയവായി സംസാരിക്കൂ.",
-                'mr-IN': "तुम्ही तिथे आहात का? कृपया बोला.",
-                'or-IN': "ଆପଣ ସେଠାରେ ଅଛନ୍ତି କି? ଦୟାକରି କୁହନ୍ତୁ।",
-                'pa-IN': "ਕੀ ਤੁਸੀਂ ਉਥੇ ਹੋ? ਕਿਰਪਾ ਕਰਕੇ ਬੋਲੋ।",
-                'ta-IN': "நீங்கள் அங்கே இருக்கிறீர்களா? தயவுசெய்து பேசுங்கள்.",
-                'te-IN': "మీరు అక్కడ ఉన్నారా? దయచేసి మాట్లాడండి."
-            }
-        else:
-            warning_texts = {
-                'en-IN': "I'm waiting for you. Anything else you'd like to say?",
-                'hi-IN': "मैं आपका इंतज़ार कर रहा हूँ। कुछ और कहना चाहते हैं?",
-                'bn-IN': "আমি আপনার জন্য অপেক্ষা করছি। আর কিছু বলতে চান?",
-                'gu-IN': "હું તમારી રાહ જોઉં છું. બીજું કંઈ કહેવા માંગો છો?",
-                'kn-IN': "ನಾನು ನಿಮಗಾಗಿ ಕಾಯುತ್ತಿದ್ದೇನೆ. ಇನ್ನೇನಾದರೂ ಹೇಳಲು ಬಯಸುತ್ತೀರಾ?",
-                'ml-IN': "ഞാൻ നിങ്ങൾക്കായി കാത്തിരിക്കുന്നു. മറ്റെന്തെങ്കിലും പറയാനുണ്ടോ?",
-                'mr-IN': "मी तुमची वाट पाहत आहे. आणखी काही सांगायचे आहे का?",
-                'or-IN': "ମୁଁ ଆପଣଙ୍କ ପାଇଁ ଅପେକ୍ଷା କରୁଛି। ଆଉ କିଛି କହିବାକୁ ଚାହୁଁଛନ୍ତି କି?",
-                'pa-IN': "ਮੈਂ ਤੁਹਾਡੀ ਉਡੀਕ ਕਰ ਰਿਹਾ ਹਾਂ। ਕੁਝ ਹੋਰ ਕਹਿਣਾ ਚਾਹੁੰਦੇ ਹੋ?",
-                'ta-IN': "நான் உங்களுக்காக காத்திருக்கிறேன். வேறு ஏதாவது சொல்ல விரும்புகிறீர்களா?",
-                'te-IN': "నేను మీ కోసం ఎదురు చూస్తున్నాను. ఇంకా ఏదైనా చెప్పాలనుకుంటున్నారా?"
-            }
+        try:
+            await self._deliver_silence_warning(connection_id, conn, conn.current_language, warning_number)
+        finally:
+            conn.warning_in_flight = False
 
+    async def _deliver_silence_warning(self, connection_id: str, conn: Connection, current_language: str, warning_number: int):
+        """Generate the silence warning audio and send it"""
+        # Multi-language silence warnings
+        warning_texts = FIRST_SILENCE_WARNINGS if warning_number == 1 else FINAL_SILENCE_WARNINGS
         warning_text = warning_texts.get(current_language, warning_texts['en-IN'])
 
         logger.info(f"Sending silence warning {warning_number} to {connection_id} in {current_language}")
@@ -1028,106 +1631,87 @@ class TelerWebSocketHandler:
         # Get appropriate speaker
         speaker = self._get_speaker_for_language(current_language)
 
-        warning_audio = await sarvam_service.text_to_speech(
-            text=warning_text,
-            language=current_language,
-            speaker=speaker
-        )
-
-        if warning_audio:
-            warning_message = {
-                "type": "audio",
-                "audio_b64": warning_audio,
-                "chunk_id": self.chunk_counter
-            }
-
-            self.chunk_counter += 1
+        warning_frame = await self._get_cached_audio_frame(warning_text, current_language, speaker)
 
-            try:
-                await websocket.send_text(json.dumps(warning_message))
-                logger.info(f"✅ Sent silence warning {warning_number} to {connection_id}")
-            except Exception as e:
-                logger.error(f"Failed to send silence warning: {e}")
+        if warning_frame and not conn.call_ended:
+            conn.send(_complete_audio_frame(warning_frame, next(conn.chunk_ids)))
+            logger.info(f"✅ Sent silence warning {warning_number} to {connection_id}")
     
     async def _end_call_gracefully(self, connection_id: str):
         """End the call gracefully with a thank you message (auto-timeout)"""
-        current_language = self.call_states.get(connection_id, {}).get('current_language', 'en-IN')
+        conn = self.connections.get(connection_id)
+        current_language = conn.current_language if conn is not None else 'en-IN'
         await self._end_call_with_goodbye(connection_id, current_language, reason="inactivity")
 
     async def _end_call_with_goodbye(self, connection_id: str, language: str = 'en-IN', reason: str = "user_request"):
         """End the call with a goodbye message in the specified language"""
-        logger.info(f"🔚 _end_call_with_goodbye called for {connection_id} (language: {language}, reason: {reason})")
-
-        websocket = self.active_connections.get(connection_id)
-        if not websocket:
+        conn = self.connections.get(connection_id)
+        if conn is None:
             logger.warning(f"⚠️ No active websocket found for {connection_id}")
             return
 
         # Mark call as ended FIRST to prevent any further processing
-        logger.info(f"🚫 Marking call as ended for {connection_id}")
-        if connection_id in self.call_states:
-            self.call_states[connection_id]['call_ended'] = True
-            self.call_states[connection_id]['status'] = 'ended'
-            self.call_states[connection_id]['disconnect_reason'] = reason
-            logger.info(f"✅ Call state updated: call_ended={self.call_states[connection_id]['call_ended']}, reason={reason}")
+        conn.call_ended = True
+        conn.status = 'ended'
+        conn.disconnect_reason = reason
 
         # Save call transcript to database and send to webhook
-        logger.info(f"💾 Saving call transcript for {connection_id}")
         await self._save_call_transcript(connection_id)
 
-        # Multi-language goodbye messages
-        farewell_texts = {
-            'en-IN': "Thank you for calling. Have a great day. Goodbye!",
-            'hi-IN': "कॉल करने के लिए धन्यवाद। आपका दिन शुभ हो। नमस्ते!",
-            'bn-IN': "কল করার জন্য ধন্যবাদ। আপনার দিন শুভ হোক। বিদায়!",
-            'gu-IN': "કૉલ કરવા બદલ આભાર. તમારો દિવસ સારો રહે. ગુડબાય!",
-            'kn-IN': "ಕರೆ ಮಾಡಿದ್ದಕ್ಕಾಗಿ ಧನ್ಯವಾದಗಳು. ನಿಮ್ಮ ದಿನ ಶುಭವಾಗಲಿ. ವಿದಾಯ!",
-            'ml-IN': "വിളിച്ചതിന് നന്ദി. നിങ്ങളുടെ ദിവസം നല്ലതായിരിക്കട്ടെ. വിട!",
-            'mr-IN': "कॉल केल्याबद्दल धन्यवाद. तुमचा दिवस चांगला जावो. निरोप!",
-            'or-IN': "କଲ କରିବା ପାଇଁ ଧନ୍ୟବାଦ। ଆପଣଙ୍କ ଦିନ ଭଲ ହେଉ। ଗୁଡବାଇ!",
-            'pa-IN': "ਕਾਲ ਕਰਨ ਲਈ ਧੰਨਵਾਦ। ਤੁਹਾਡਾ ਦਿਨ ਚੰਗਾ ਰਹੇ। ਅਲਵਿਦਾ!",
-            'ta-IN': "அழைத்ததற்கு நன்றி. உங்கள் நாள் இனிதாக அமையட்டும். குட்பை!",
-            'te-IN': "కాల్ చేసినందుకు ధన్యవాదాలు. మీ రోజు మంచిగా ఉండాలి. వీడ్కోలు!"
-        }
-
-        farewell_text = farewell_texts.get(language, farewell_texts['en-IN'])
 
-        logger.info(f"🎬 Ending call gracefully for {connection_id} (reason: {reason}, language: {language})")
-        logger.info(f"💬 Farewell text: '{farewell_text}'")
+        farewell_text = FAREWELL_MESSAGES.get(language, FAREWELL_MESSAGES['en-IN'])
 
         # Get appropriate speaker
         speaker = self._get_speaker_for_language(language)
-        logger.info(f"🗣️ Using speaker: {speaker}")
 
-        logger.info(f"🔊 Generating farewell TTS audio...")
-        farewell_audio = await sarvam_service.text_to_speech(
-            text=farewell_text,
-            language=language,
-            speaker=speaker
+        # One record for the whole end-of-call sequence (lazy %-formatting)
+        logger.info(
+            "🎬 Ending call %s (reason: %s, language: %s, speaker: %s, farewell: %d chars)",
+            connection_id, reason, language, speaker, len(farewell_text),
+            extra={
+                'cid': connection_id,
+                'lang': language,
+                'reason': reason,
+                'speaker': speaker,
+                'farewell_len': len(farewell_text)
+            }
         )
 
-        if farewell_audio:
-            logger.info(f"✅ Farewell audio generated successfully")
-            farewell_message = {
-                "type": "audio",
-                "audio_b64": farewell_audio,
-                "chunk_id": self.chunk_counter
-            }
+        farewell_frame = await self._get_cached_audio_frame(farewell_text, language, speaker)
 
-            self.chunk_counter += 1
+        playback_done = None
+        if farewell_frame:
+            chunk_id = next(conn.chunk_ids)
 
-            try:
-                await websocket.send_text(json.dumps(farewell_message))
-                logger.info(f"✅ Sent farewell message to {connection_id} in {language}")
+            # Register before sending so a fast ack cannot be missed
+            playback_done = asyncio.Event()
+            conn.playback_events[chunk_id] = playback_done
 
-                # Wait for the message to be sent and played
-                # Increased to 5 seconds to ensure non-English messages have time to play
-                logger.info(f"⏳ Waiting 5 seconds for farewell audio to play...")
-                await asyncio.sleep(5)
-                logger.info(f"✅ Farewell audio playback time elapsed, proceeding with connection closure")
+            conn.send(_complete_audio_frame(farewell_frame, chunk_id))
 
-            except Exception as e:
-                logger.error(f"Failed to send farewell message: {e}")
+        # Close once the farewell has played. This runs in the background so the
+        # receive loop (which may be the caller of this method) stays free to
+        # deliver the client's playback_complete ack.
+        conn.closing_task = asyncio.create_task(
+            self._close_after_playback(connection_id, conn, reason, playback_done)
+        )
+
+    async def _close_after_playback(self, connection_id: str, conn: Connection, reason: str,
+                                    playback_done: Optional[asyncio.Event] = None):
+        """Wait for the farewell playback ack (bounded by a timeout), then close and clean up"""
+        websocket = conn.websocket
+        if playback_done is not None:
+            try:
+                await asyncio.wait_for(playback_done.wait(), timeout=FAREWELL_PLAYBACK_TIMEOUT_SECONDS)
+                logger.info(f"✅ Client finished playing farewell audio, proceeding with connection closure")
+            except asyncio.TimeoutError:
+                logger.info(f"⏳ No playback ack within {FAREWELL_PLAYBACK_TIMEOUT_SECONDS:.0f}s, proceeding with connection closure")
+        else:
+            # No farewell to wait for; still let frames already queued reach the socket
+            try:
+                await asyncio.wait_for(conn.outbound.join(), timeout=FAREWELL_PLAYBACK_TIMEOUT_SECONDS)
+            except asyncio.TimeoutError:
+                pass
 
         # Close the WebSocket connection
         try:
@@ -1143,85 +1727,69 @@ class TelerWebSocketHandler:
     
     async def send_interrupt(self, connection_id: str, chunk_id: int):
         """Send interrupt message to stop specific chunk playback"""
-        websocket = self.active_connections.get(connection_id)
-        if not websocket:
+        conn = self.connections.get(connection_id)
+        if conn is None:
             return
-        
-        interrupt_message = {
-            "type": "interrupt",
-            "chunk_id": chunk_id
-        }
-        
-        try:
-            await websocket.send_text(json.dumps(interrupt_message))
-            logger.info(f"Sent interrupt for chunk {chunk_id}")
-        except Exception as e:
-            logger.error(f"Failed to send interrupt: {e}")
+
+        conn.send(_interrupt_frame(chunk_id))
+        logger.info(f"Sent interrupt for chunk {chunk_id}")
     
     async def send_clear(self, connection_id: str):
         """Send clear message to wipe out entire buffer"""
-        websocket = self.active_connections.get(connection_id)
-        if not websocket:
+        conn = self.connections.get(connection_id)
+        if conn is None:
             return
-        
-        clear_message = {"type": "clear"}
-        
-        try:
-            await websocket.send_text(json.dumps(clear_message))
-            logger.info("Sent clear message")
-        except Exception as e:
-            logger.error(f"Failed to send clear: {e}")
+
+        conn.send(_CLEAR_FRAME)
+        logger.info("Sent clear message")
     
+    def send_error(self, connection_id: str, message: str) -> bool:
+        """
+        Report an error to the client through the connection's writer.
+
+        Args:
+            connection_id: Connection identifier
+            message: Error description
+
+        Returns:
+            False if the connection is already gone
+        """
+        conn = self.connections.get(connection_id)
+        if conn is None:
+            return False
+
+        conn.send(_json_dumps({"type": "error", "message": message}))
+        return True
+
     def get_stream_info(self, connection_id: str) -> Optional[Dict[str, Any]]:
         """Get stream metadata for a connection"""
-        return self.stream_metadata.get(connection_id)
+        conn = self.connections.get(connection_id)
+        return conn.stream_metadata if conn is not None else None
     
-    def get_active_streams(self) -> Dict[str, Dict[str, Any]]:
-        """Get all active stream metadata"""
-        return self.stream_metadata.copy()
+    def get_active_streams(self) -> Mapping[str, Dict[str, Any]]:
+        """
+        Get all active stream metadata as a live read-only view (no copy).
+        Callers must not mutate the metadata dicts; copy the view if a snapshot is needed.
+        """
+        return MappingProxyType(self.active_streams)
+
+    def _matches_end_call_phrase(self, text_lower: str) -> bool:
+        """Check already lowercased and stripped text for an end call phrase"""
+        logger.debug("🔍 Checking if text is end call request: '%s'", text_lower)
 
-    def _is_end_call_request(self, text: str) -> bool:
-        """Check if user wants to end the call"""
-        if not text:
+        # Long narration is not a sign-off; skip the substring scans entirely
+        if len(text_lower) > END_CALL_MAX_TEXT_LENGTH:
+            logger.debug(f"✅ Not an end call request (text too long: {len(text_lower)} chars)")
             return False
 
-        text_lower = text.lower().strip()
-        logger.debug(f"🔍 Checking if text is end call request: '{text_lower}'")
-
-        # End call phrases in multiple languages
-        end_phrases = [
-            # English
-            "goodbye", "bye", "end call", "hang up", "disconnect", "that's all",
-            "nothing else", "no more", "i'm done", "thank you bye", "thanks bye",
-            "end the call", "finish the call", "bye bye", "good bye",
-            # Hindi
-            "धन्यवाद", "अलविदा", "नमस्ते", "कॉल खत्म करो", "कॉल बंद करो",
-            "बस इतना ही", "और कुछ नहीं", "काफी है", "हो गया",
-            # Bengali
-            "ধন্যবাদ", "বিদায়", "কল শেষ করুন", "যথেষ্ট",
-            # Gujarati
-            "આભાર", "ગુડબાય", "કૉલ બંધ કરો", "બસ",
-            # Kannada
-            "ಧನ್ಯವಾದ", "ವಿದಾಯ", "ಕರೆ ಮುಗಿಸಿ", "ಸಾಕು",
-            # Malayalam
-            "നന്ദി", "വിട", "കോൾ അവസാനിപ്പിക്കുക", "മതി",
-            # Marathi
-            "धन्यवाद", "निरोप", "कॉल बंद करा", "पुरे झाले",
-            # Odia
-            "ଧନ୍ୟବାଦ", "ଗୁଡବାଇ", "କଲ୍ ଶେଷ କରନ୍ତୁ",
-            # Punjabi
-            "ਧੰਨਵਾਦ", "ਅਲਵਿਦਾ", "ਕਾਲ ਖਤਮ ਕਰੋ",
-            # Tamil
-            "நன்றி", "குட்பை", "அழைப்பை முடிக்கவும்", "போதும்",
-            # Telugu
-            "ధన్యవాదాలు", "వీడ్కోలు", "కాల్ ముగించు", "చాలు"
-        ]
+        # ASCII-only text cannot contain any of the Indic phrases
+        end_call_re = _ASCII_END_CALL_RE if text_lower.isascii() else _END_CALL_RE
 
         # Check if any end phrase is in the text
-        for phrase in end_phrases:
-            if phrase in text_lower:
-                logger.info(f"🛑 DETECTED END CALL PHRASE: '{phrase}' in user text: '{text}'")
-                return True
+        match = end_call_re.search(text_lower)
+        if match:
+            logger.debug("🛑 Detected end call phrase '%s' in user text: '%s'", match.group(), text_lower)
+            return True
 
         logger.debug(f"✅ Not an end call request")
         return False
@@ -1229,60 +1797,45 @@ class TelerWebSocketHandler:
     def _get_knowledge_base_for_call(self, call_id: str, stream_id: str = None, account_id: str = None) -> Optional[str]:
         """Look up knowledge base ID associated with a call using multiple possible identifiers"""
         try:
-            from fastapi_app import call_history
-            logger.info(f"🔍 Looking up knowledge base for call_id: '{call_id}', stream_id: '{stream_id}', account_id: '{account_id}'")
-            logger.info(f"📚 Call history has {len(call_history)} entries")
+            logger.debug("🔍 Looking up knowledge base for call_id: '%s', stream_id: '%s', account_id: '%s' (%d calls in history)",
+                         call_id, stream_id, account_id, len(self.call_history))
 
             if not call_id and not stream_id:
                 logger.warning(f"⚠️ No identifiers provided for lookup")
                 return None
 
+            # Direct match on call_id
+            call = self.call_history_by_id.get(call_id)
+            if call is not None:
+                kb_id = call.get('knowledge_base_id')
+                if kb_id:
+                    logger.info(f"✅ Found knowledge base '{kb_id}' for call '{call_id}' (direct match)")
+                else:
+                    logger.info(f"ℹ️ Call '{call_id}' found but no knowledge base associated")
+                return kb_id
+
             # Try to find the most recent call with a knowledge base (for Teler calls)
             # Since Teler uses different IDs, we'll use a time-based approach
             # Look for calls initiated in the last 5 minutes with a knowledge base
-            from datetime import datetime, timedelta
+            logger.info(f"🔍 No direct match found, looking for recent conversation calls with KB...")
             recent_threshold = datetime.now() - timedelta(minutes=5)
 
-            for idx, call in enumerate(call_history):
-                stored_call_id = call.get('call_id')
-                kb_id = call.get('knowledge_base_id')
-                call_timestamp = call.get('timestamp')
-                call_type = call.get('call_type')
-
-                logger.info(f"  [{idx}] call_id: '{stored_call_id}' | KB: '{kb_id}' | Type: '{call_type}' | Time: {call_timestamp}")
-
-                # Direct match on call_id
-                if stored_call_id == call_id:
-                    if kb_id:
-                        logger.info(f"✅ Found knowledge base '{kb_id}' for call '{call_id}' (direct match)")
-                        return kb_id
-                    else:
-                        logger.info(f"ℹ️ Call '{call_id}' found but no knowledge base associated")
-                        return None
+            # Newest first, so everything after the first stale entry is stale too
+            for call_time, call in self.recent_kb_calls:
+                if call_time < recent_threshold:
+                    break
 
-            # If no direct match, find the most recent "conversation" type call with a KB
-            logger.info(f"🔍 No direct match found, looking for recent conversation calls with KB...")
-            for idx, call in enumerate(call_history):
-                call_type = call.get('call_type')
                 kb_id = call.get('knowledge_base_id')
-                call_timestamp_str = call.get('timestamp')
-
-                if call_type == 'conversation' and kb_id:
-                    try:
-                        call_time = datetime.fromisoformat(call_timestamp_str)
-                        if call_time >= recent_threshold:
-                            logger.info(f"✅ Using knowledge base '{kb_id}' from recent call (within 5 min): {call.get('call_id')}")
-                            return kb_id
-                    except:
-                        pass
-
-            logger.warning(f"❌ No matching call found in history for call_id: '{call_id}'")
-            logger.warning(f"Available call IDs: {[call.get('call_id') for call in call_history]}")
+                if call.get('call_type') == 'conversation' and kb_id:
+                    logger.info(f"✅ Using knowledge base '{kb_id}' from recent call (within 5 min): {call.get('call_id')}")
+                    return kb_id
+
+            logger.warning(f"❌ No matching call found in history for call_id: '{call_id}' ({len(self.call_history_by_id)} known call IDs)")
             return None
         except Exception as e:
             logger.error(f"❌ Error looking up knowledge base for call: {e}")
-            import traceback
-            logger.error(traceback.format_exc())
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug(traceback.format_exc())
             return None
 
 # Global instance
@@ -21,6 +21,11 @@ interface RecordedChunk {
   isPlaying?: boolean;
 }
 
+interface QueuedAudio {
+  audioBase64: string;
+  chunkId?: number;
+}
+
 interface StartMessage {
   type: 'start';
   user_id:'demo-user-123';
@@ -62,6 +67,7 @@ export const WebSocketAudioClient: React.FC<WebSocketAudioClientProps> = ({
   const audioContextRef = useRef<AudioContext | null>(null);
   const streamRef = useRef<MediaStream | null>(null);
   const playingAudioRef = useRef<HTMLAudioElement | null>(null);
+  const audioQueueRef = useRef<QueuedAudio[]>([]);
   const recordingTimeoutRef = useRef<NodeJS.Timeout | null>(null);
 
   const WS_URL = `${import.meta.env.VITE_API_URL?.replace('https', 'wss') || 'wss://5cc8f325ede1.ngrok-free.app'}/media-stream`;
@@ -163,10 +169,13 @@ export const WebSocketAudioClient: React.FC<WebSocketAudioClientProps> = ({
           if (message.type === 'audio') {
             const audioData = message.audio_b64 || message.data?.audio_b64;
             if (audioData) {
-              console.log('🔊 Received TTS audio response from backend, playing...');
+              console.log('🔊 Received TTS audio response from backend, queueing for playback...');
               setIsProcessing(false);
-              playAudioResponse(audioData);
+              enqueueAudioResponse(audioData, message.chunk_id);
             }
+          } else if (message.type === 'clear') {
+            console.log('🧹 Clear received, dropping queued audio');
+            clearAudioQueue();
           }
         } catch (error) {
           console.error('❌ Error parsing WebSocket message:', error);
@@ -219,11 +228,8 @@ export const WebSocketAudioClient: React.FC<WebSocketAudioClientProps> = ({
       audioContextRef.current.close();
     }
     
-    if (playingAudioRef.current) {
-      playingAudioRef.current.pause();
-      playingAudioRef.current = null;
-    }
-    
+    clearAudioQueue();
+
     setIsConnected(false);
     setIsRecording(false);
     setConnectionStatus('Disconnected');
@@ -522,7 +528,47 @@ export const WebSocketAudioClient: React.FC<WebSocketAudioClientProps> = ({
     });
   };
 
-  const playAudioResponse = async (audioBase64: string) => {
+  // The backend sends one clip per sentence, so clips are queued and played back to back
+  const enqueueAudioResponse = (audioBase64: string, chunkId?: number) => {
+    audioQueueRef.current.push({ audioBase64, chunkId });
+    if (!playingAudioRef.current) {
+      playNextAudioResponse();
+    }
+  };
+
+  const playNextAudioResponse = () => {
+    const next = audioQueueRef.current.shift();
+    if (!next) {
+      setIsPlaying(false);
+      return;
+    }
+    playAudioResponse(next.audioBase64, next.chunkId);
+  };
+
+  const clearAudioQueue = () => {
+    audioQueueRef.current = [];
+    if (playingAudioRef.current) {
+      playingAudioRef.current.pause();
+      playingAudioRef.current = null;
+    }
+    setIsPlaying(false);
+  };
+
+  const playAudioResponse = async (audioBase64: string, chunkId?: number) => {
+    let audioUrl: string | null = null;
+    let finished = false;
+
+    // Release this clip and start the next one; runs once whichever way playback ends
+    const finishPlayback = () => {
+      if (finished) return;
+      finished = true;
+      if (audioUrl) {
+        URL.revokeObjectURL(audioUrl);
+      }
+      playingAudioRef.current = null;
+      playNextAudioResponse();
+    };
+
     try {
       console.log('🔊 Playing TTS audio response, length:', audioBase64.length);
       setIsPlaying(true);
@@ -537,32 +583,33 @@ export const WebSocketAudioClient: React.FC<WebSocketAudioClientProps> = ({
       
       // Create blob and play
       const audioBlob = new Blob([audioArray], { type: 'audio/mp3' });
-      const audioUrl = URL.createObjectURL(audioBlob);
+      audioUrl = URL.createObjectURL(audioBlob);
       
       const audio = new Audio(audioUrl);
       playingAudioRef.current = audio;
       
       audio.onended = () => {
-        setIsPlaying(false);
-        URL.revokeObjectURL(audioUrl);
-        playingAudioRef.current = null;
         console.log('✅ Audio response playback finished');
+
+        // Let the backend know playback is done (used to close promptly after the farewell)
+        if (chunkId !== undefined && wsRef.current?.readyState === WebSocket.OPEN) {
+          wsRef.current.send(JSON.stringify({ type: 'playback_complete', chunk_id: chunkId }));
+        }
+        finishPlayback();
       };
       
       audio.onerror = (error) => {
         console.error('❌ Audio playback error:', error);
-        setIsPlaying(false);
         setIsProcessing(false);
-        URL.revokeObjectURL(audioUrl);
-        playingAudioRef.current = null;
+        finishPlayback();
       };
       
       await audio.play();
       
     } catch (error) {
       console.error('❌ Failed to play audio response:', error);
-      setIsPlaying(false);
       setIsProcessing(false);
+      finishPlayback();
     }
   };
 